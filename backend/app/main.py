@@ -1,11 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import repositories, auth
+from .services import github, implementation_runner, scan_engine, sweeper
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Complete due jobs and drop old ones in the background
+    sweep_task = asyncio.create_task(sweeper.run())
+    yield
+    sweep_task.cancel()
+    # Drop queued scans so shutdown doesn't wait for them
+    scan_engine.shutdown()
+    # Drop queued implementations and stop the running agents
+    implementation_runner.shutdown()
+    # Release the pooled GitHub connections shared by the routers and the scan engine
+    github.close_session()
 
 app = FastAPI(
     title="AutoPull",
     description="A platform that helps users find and implement 'low-hanging fruit' issues in GitHub repositories using coding agents.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -1,8 +1,18 @@
+import os
 import uuid
 import time
 import random
 from typing import Dict, List, Any
 
+from ..services.store import open_store
+
+# Seconds a completed scan is reused for new scans of the same repository
+SCAN_FRESHNESS_SECONDS = int(os.environ.get("SCAN_FRESHNESS_SECONDS", 600))
+
+# Seconds a mock scan and a mock implementation take
+SCAN_DURATION = 5
+IMPLEMENTATION_DURATION = 10
+
 # Mock issues for different repositories
 MOCK_ISSUES = {
     "default": [
@@ -143,29 +153,50 @@ MOCK_PRS = {
     }
 }
 
-# Store active scans and implementations
-active_scans: Dict[str, Dict[str, Any]] = {}
-active_implementations: Dict[str, Dict[str, Any]] = {}
+# Store active scans and implementations (values read from them are copies, so changes are written back)
+active_scans = open_store("mock_scans")
+active_implementations = open_store("mock_implementations")
+# Latest scan of each repository, so concurrent and repeated scans can share it
+latest_scans = open_store("mock_latest_scans")
 
 def extract_repo_info(repo_url: str) -> str:
-    """Extract repository owner/name from URL."""
-    parts = repo_url.strip('/').split('/')
+    """Extract the normalized (lowercase) repository owner/name from URL."""
+    parts = repo_url.strip().strip('/').split('/')
     if 'github.com' in parts:
         owner_index = parts.index('github.com') + 1
         if len(parts) > owner_index + 1:
-            return f"{parts[owner_index]}/{parts[owner_index + 1]}"
+            name = parts[owner_index + 1]
+            if name.endswith('.git'):
+                name = name[:-len('.git')]
+            return f"{parts[owner_index]}/{name}".lower()
     return "default"
 
+def progress_percent(start_time: float, duration: float) -> int:
+    """Percentage of a simulated job's duration that has passed, kept below 100 until it completes."""
+    return min(int(100 * (time.time() - start_time) / duration), 99)
+
 def start_scan(repo_url: str) -> Dict[str, Any]:
-    """Start a mock scan of a repository."""
-    scan_id = str(uuid.uuid4())
+    """
+    Start a mock scan of a repository.
+    A scan of the same repository that is still running, or that completed
+    less than SCAN_FRESHNESS_SECONDS ago, is returned instead of starting a new one.
+    """
     repo_key = extract_repo_info(repo_url)
+    if repo_key != "default" and latest_scans.get(repo_key) in active_scans:
+        scan_id = latest_scans[repo_key]
+        result = get_scan_status(scan_id)
+        scan = active_scans[scan_id]
+        if scan["status"] == "in_progress" or time.time() - scan["end_time"] <= SCAN_FRESHNESS_SECONDS:
+            return result
     
+    scan_id = str(uuid.uuid4())
+    latest_scans[repo_key] = scan_id
     active_scans[scan_id] = {
         "repo_url": repo_url,
         "repo_key": repo_key,
         "status": "in_progress",
         "start_time": time.time(),
+        "end_time": None,
         "issues": None
     }
     
@@ -181,21 +212,27 @@ def get_scan_status(scan_id: str) -> Dict[str, Any]:
     
     scan = active_scans[scan_id]
     
-    # Simulate scan completion after 5 seconds
-    if scan["status"] == "in_progress" and time.time() - scan["start_time"] > 5:
+    # Simulate scan completion after SCAN_DURATION seconds
+    if scan["status"] == "in_progress" and time.time() - scan["start_time"] > SCAN_DURATION:
         repo_key = scan["repo_key"]
         scan["status"] = "completed"
+        scan["end_time"] = time.time()
         scan["issues"] = MOCK_ISSUES.get(repo_key, MOCK_ISSUES["default"])
+        active_scans[scan_id] = scan
     
     return {
         "scan_id": scan_id,
         "status": scan["status"],
-        "issues": scan["issues"] if scan["status"] == "completed" else None
+        "issues": scan["issues"] if scan["status"] == "completed" else None,
+        "progress": {
+            "stage": "completed" if scan["status"] == "completed" else "scanning",
+            "percent": 100 if scan["status"] == "completed" else progress_percent(scan["start_time"], SCAN_DURATION)
+        }
     }
 
-def start_implementation(scan_id: str, issue_id: int) -> Dict[str, Any]:
-    """Start a mock implementation of an issue."""
-    if scan_id not in active_scans:
+def start_implementation(scan_id: str, issue_id: int, require_scan: bool = True) -> Dict[str, Any]:
+    """Start a mock implementation of an issue; `require_scan=False` accepts scans made elsewhere."""
+    if require_scan and scan_id not in active_scans:
         return {"status": "scan_not_found"}
     
     implementation_id = str(uuid.uuid4())
@@ -205,6 +242,7 @@ def start_implementation(scan_id: str, issue_id: int) -> Dict[str, Any]:
         "issue_id": issue_id,
         "status": "in_progress",
         "start_time": time.time(),
+        "end_time": None,
         "pull_request": None
     }
     
@@ -220,13 +258,60 @@ def get_implementation_status(implementation_id: str) -> Dict[str, Any]:
     
     implementation = active_implementations[implementation_id]
     
-    # Simulate implementation completion after 10 seconds
-    if implementation["status"] == "in_progress" and time.time() - implementation["start_time"] > 10:
+    # Simulate implementation completion after IMPLEMENTATION_DURATION seconds
+    if implementation["status"] == "in_progress" and time.time() - implementation["start_time"] > IMPLEMENTATION_DURATION:
         implementation["status"] = "completed"
+        implementation["end_time"] = time.time()
         implementation["pull_request"] = MOCK_PRS.get(implementation["issue_id"])
+        active_implementations[implementation_id] = implementation
     
     return {
         "implementation_id": implementation_id,
         "status": implementation["status"],
-        "pull_request": implementation["pull_request"] if implementation["status"] == "completed" else None
-    } 
\ No newline at end of file
+        "pull_request": implementation["pull_request"] if implementation["status"] == "completed" else None,
+        "progress": {
+            "stage": "implementing" if implementation["status"] == "in_progress" else implementation["status"],
+            "percent": (progress_percent(implementation["start_time"], IMPLEMENTATION_DURATION)
+                        if implementation["status"] == "in_progress" else 100)
+        }
+    }
+
+def cancel_implementation(implementation_id: str) -> Dict[str, Any]:
+    """Cancel an implementation that is still in progress. Returns its status."""
+    result = get_implementation_status(implementation_id)
+    if result["status"] == "in_progress":
+        implementation = active_implementations[implementation_id]
+        implementation["status"] = "cancelled"
+        implementation["end_time"] = time.time()
+        active_implementations[implementation_id] = implementation
+        result = get_implementation_status(implementation_id)
+    return result
+
+def sweep(retention: float) -> Dict[str, int]:
+    """
+    Complete the scans and implementations that are due, and drop the ones that
+    finished more than `retention` seconds ago.
+    Returns how many jobs are left, were completed and were dropped.
+    """
+    counts = {"scans": 0, "implementations": 0, "completed": 0, "expired": 0}
+    now = time.time()
+    for jobs, get_status, kind in ((active_scans, get_scan_status, "scans"),
+                                   (active_implementations, get_implementation_status, "implementations")):
+        for job_id in list(jobs):
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            if job["status"] == "in_progress" and get_status(job_id)["status"] != "in_progress":
+                counts["completed"] += 1
+                job = jobs.get(job_id) or job
+            if job["status"] != "in_progress" and now - (job.get("end_time") or now) > retention:
+                jobs.pop(job_id, None)
+                counts["expired"] += 1
+            else:
+                counts[kind] += 1
+    
+    # Forget repositories whose latest scan is gone
+    for repo_key in list(latest_scans):
+        if latest_scans.get(repo_key) not in active_scans:
+            latest_scans.pop(repo_key, None)
+    return counts
@@ -30,16 +30,31 @@ class PullRequest(BaseModel):
 class ScanRequest(BaseModel):
     repository_url: str
 
+class ScanProgress(BaseModel):
+    stage: str
+    issues_found: int = 0
+    issues_processed: int = 0
+    percent: Optional[int] = None
+
 class ScanResponse(BaseModel):
     scan_id: str
     status: str
     issues: Optional[List[Issue]] = None
+    progress: Optional[ScanProgress] = None
+    error: Optional[str] = None
 
 class ImplementationRequest(BaseModel):
     scan_id: str
     issue_id: int
+    priority: int = 0  # Higher priorities run first
+
+class ImplementationProgress(BaseModel):
+    stage: str
+    percent: Optional[int] = None
 
 class ImplementationResponse(BaseModel):
     implementation_id: str
     status: str
-    pull_request: Optional[PullRequest] = None 
\ No newline at end of file
+    pull_request: Optional[PullRequest] = None
+    progress: Optional[ImplementationProgress] = None
+    error: Optional[str] = None 
\ No newline at end of file
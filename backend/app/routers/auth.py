@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Response, Cookie, Request, Depends
 from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uuid
 import requests
 import os
 import logging
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, List
 from ..models.models import User, Repository
+from ..services.github import get_session
+from ..services.store import open_store
+from ..services.ttl_cache import TTLCache
 from dotenv import load_dotenv
 
 # Configure logging
@@ -25,6 +30,9 @@ else:
 GITHUB_CLIENT_ID = os.environ.get("GITHUB_CLIENT_ID", "mock_client_id")
 GITHUB_CLIENT_SECRET = os.environ.get("GITHUB_CLIENT_SECRET", "mock_client_secret")
 FRONTEND_URL = "http://localhost:5173"
+# GitHub endpoints, overridable to point the backend at a local stand-in
+GITHUB_URL = os.environ.get("GITHUB_URL", "https://github.com").rstrip('/')
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip('/')
 
 # For mock mode, we'll use a flag to determine if we're using real GitHub or mocks
 USE_MOCK_GITHUB = not (os.environ.get("GITHUB_CLIENT_ID") and os.environ.get("GITHUB_CLIENT_SECRET")) or GITHUB_CLIENT_ID == "mock_client_id"
@@ -38,8 +46,17 @@ router = APIRouter(
     tags=["auth"],
 )
 
-# Mock user database (in a real app, this would be in a database)
-mock_users = {}
+# Seconds a login lasts, both for the session cookie and the stored session
+SESSION_MAX_AGE = 3600
+
+# Mock user database, in memory or shared through SQLite (see services/store.py)
+mock_users = open_store("sessions", ttl=SESSION_MAX_AGE)
+
+# Repository lists per GitHub user, kept for REPO_CACHE_TTL seconds. Refreshes are
+# conditional requests, which cost no rate limit when nothing changed.
+REPO_CACHE_TTL = int(os.environ.get("REPO_CACHE_TTL", 300))
+REPO_CACHE_SIZE = int(os.environ.get("REPO_CACHE_SIZE", 1000))
+repository_cache = TTLCache(REPO_CACHE_SIZE, REPO_CACHE_TTL)
 
 # Mock repositories for testing when not using real GitHub
 MOCK_REPOSITORIES = [
@@ -97,7 +114,7 @@ async def github_auth_redirect():
         return RedirectResponse(f"{FRONTEND_URL}/auth-callback?user_id={mock_user_id}")
     
     # Standard OAuth flow with only public repo access
-    auth_url = f"https://github.com/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}&scope=public_repo"
+    auth_url = f"{GITHUB_URL}/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}&scope=public_repo"
     logger.info(f"Redirecting to GitHub OAuth: {auth_url}")
     return RedirectResponse(auth_url)
 
@@ -129,7 +146,7 @@ async def github_auth_callback(code: str = None):
         return RedirectResponse(f"{FRONTEND_URL}/login?error=missing_parameters")
         
     # Exchange code for access token
-    token_url = "https://github.com/login/oauth/access_token"
+    token_url = f"{GITHUB_URL}/login/oauth/access_token"
     payload = {
         "client_id": GITHUB_CLIENT_ID,
         "client_secret": GITHUB_CLIENT_SECRET,
@@ -139,7 +156,8 @@ async def github_auth_callback(code: str = None):
     
     try:
         logger.info("Exchanging code for access token...")
-        response = requests.post(token_url, data=payload, headers=headers)
+        # The GitHub calls block, so they run in the thread pool to keep the event loop serving other requests
+        response = await run_in_threadpool(get_session().post, token_url, data=payload, headers=headers)
         response.raise_for_status()
         token_data = response.json()
         
@@ -152,7 +170,7 @@ async def github_auth_callback(code: str = None):
         
         # Get user info from GitHub
         logger.info("Getting user info from GitHub...")
-        github_user = get_github_user(access_token)
+        github_user = await run_in_threadpool(get_github_user, access_token)
         
         # Generate a user ID
         user_id = str(uuid.uuid4())
@@ -202,7 +220,7 @@ async def set_github_token(auth_request: GitHubAuthRequest, response: Response):
             key="user_id",
             value=auth_request.code,
             httponly=True,
-            max_age=3600,  # 1 hour
+            max_age=SESSION_MAX_AGE,
             samesite="lax",
             secure=False,  # Set to True in production with HTTPS
             path="/"  # Make cookie available for all paths
@@ -276,11 +294,16 @@ async def get_user_repositories(user_id: Optional[str] = Cookie(None)):
             logger.info("Using mock repositories")
             repos = MOCK_REPOSITORIES
         else:
+            cached_repos = repository_cache.get(user["github_username"])
+            if cached_repos is not None:
+                logger.info(f"Returning {len(cached_repos)} cached repositories")
+                return {"repositories": cached_repos}
+            
             # Get real repositories from GitHub
             logger.info("Fetching real repositories from GitHub API")
             access_token = user["access_token"]
             logger.info(f"Using token starting with: {access_token[:5]}...")
-            repos = get_github_repositories(access_token)
+            repos = await run_in_threadpool(get_github_repositories, access_token, user["github_username"])
             logger.info(f"Fetched {len(repos)} repositories from GitHub")
             
             # If no repos were found but we're using real GitHub, fall back to mock repos for testing
@@ -298,6 +321,9 @@ async def get_user_repositories(user_id: Optional[str] = Cookie(None)):
             )
             for repo in repos
         ]
+        # Only the formatted fields are cached, and never the mock fallback
+        if not USE_MOCK_GITHUB and repos is not MOCK_REPOSITORIES:
+            repository_cache.put(user["github_username"], formatted_repos)
         
         logger.info(f"Returning {len(formatted_repos)} repositories")
         return {"repositories": formatted_repos}
@@ -321,6 +347,7 @@ async def get_user_repositories(user_id: Optional[str] = Cookie(None)):
 def get_github_user(access_token: str):
     """
     Get user info from GitHub API.
+    This blocks on the request; call it from the thread pool in async handlers.
     """
     # GitHub API accepts both "token" and "Bearer" formats, but "token" is more commonly used
     headers = {
@@ -330,7 +357,7 @@ def get_github_user(access_token: str):
     
     try:
         logger.info("Getting user info from GitHub API")
-        response = requests.get("https://api.github.com/user", headers=headers)
+        response = get_session().get(f"{GITHUB_API_URL}/user", headers=headers)
         
         # Log API rate limit info if available
         if 'X-RateLimit-Remaining' in response.headers:
@@ -347,9 +374,44 @@ def get_github_user(access_token: str):
             logger.error(f"Response body: {e.response.text}")
         raise
 
-def get_github_repositories(access_token: str):
+def iter_paginated(url: str, headers: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the items of a paginated GitHub API listing page by page, following the Link headers.
+    Stops at the first failed page.
+    """
+    while url:
+        logger.info(f"Fetching from endpoint: {url}")
+        response = get_session().get(url, headers=headers)
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch from {url}. Status: {response.status_code}")
+            return
+        yield from response.json()
+        url = response.links.get("next", {}).get("url")
+
+def get_paginated(url: str, headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Get all items of a paginated GitHub API listing; see iter_paginated."""
+    return list(iter_paginated(url, headers))
+
+def merge_repositories(listings: Iterable[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge repository listings into one list without duplicates, in order of first appearance.
+    The listings are consumed as they are iterated, and each repository costs one set lookup.
+    """
+    seen_ids = set()
+    repos = []
+    for listing in listings:
+        for repo in listing:
+            repo_id = repo.get('id')
+            if repo_id not in seen_ids:
+                seen_ids.add(repo_id)
+                repos.append(repo)
+    return repos
+
+def get_github_repositories(access_token: str, login: Optional[str] = None):
     """
     Get repositories for authenticated user from GitHub API.
+    The user's login is looked up with the token unless it is given.
+    This blocks on the requests; call it from the thread pool in async handlers.
     """
     # GitHub API accepts both "token" and "Bearer" formats, but "token" is more commonly used
     headers = {
@@ -358,52 +420,44 @@ def get_github_repositories(access_token: str):
     }
     
     try:
-        # First, let's try to get the authenticated user to verify token works
-        logger.info("Testing token by fetching user info")
-        user_response = requests.get("https://api.github.com/user", headers=headers)
-        
-        if user_response.status_code != 200:
-            logger.error(f"Unable to authenticate with GitHub. Status: {user_response.status_code}")
-            logger.error(f"Response: {user_response.text}")
-            return []  # Return empty list instead of raising exception
-        
-        user_data = user_response.json()
-        logger.info(f"Successfully authenticated as: {user_data.get('login')}")
+        if login is None:
+            # First, let's try to get the authenticated user to verify token works
+            logger.info("Testing token by fetching user info")
+            user_response = get_session().get(f"{GITHUB_API_URL}/user", headers=headers)
+            
+            if user_response.status_code != 200:
+                logger.error(f"Unable to authenticate with GitHub. Status: {user_response.status_code}")
+                logger.error(f"Response: {user_response.text}")
+                return []  # Return empty list instead of raising exception
+            
+            login = user_response.json().get('login')
+            logger.info(f"Successfully authenticated as: {login}")
         
         # Now fetch both user's own repos and repos they can access
         logger.info("Fetching user's repositories")
-        repos = []
         
         # Try different endpoints to ensure we get all accessible repos
         endpoints = [
             # User's own public repositories
-            f"https://api.github.com/users/{user_data.get('login')}/repos?type=public&sort=updated&per_page=100",
+            f"{GITHUB_API_URL}/users/{login}/repos?type=public&sort=updated&per_page=100",
             
             # All repositories the user can access (including ones they collaborate on)
-            "https://api.github.com/user/repos?visibility=public&sort=updated&per_page=100"
+            f"{GITHUB_API_URL}/user/repos?visibility=public&sort=updated&per_page=100"
         ]
         
-        for endpoint in endpoints:
-            logger.info(f"Fetching from endpoint: {endpoint}")
-            response = requests.get(endpoint, headers=headers)
-            
-            if response.status_code == 200:
-                current_repos = response.json()
-                logger.info(f"Found {len(current_repos)} repos from this endpoint")
-                
-                # Add any new repos not already in our list
-                for repo in current_repos:
-                    if repo.get('id') not in [r.get('id') for r in repos]:
-                        repos.append(repo)
-            else:
-                logger.warning(f"Failed to fetch from {endpoint}. Status: {response.status_code}")
+        # The listings are independent, so they are fetched at the same time
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            listings = list(executor.map(lambda endpoint: get_paginated(endpoint, headers), endpoints))
+        
+        for endpoint, current_repos in zip(endpoints, listings):
+            logger.info(f"Found {len(current_repos)} repos from {endpoint}")
+        repos = merge_repositories(listings)
         
         logger.info(f"Total repositories found: {len(repos)}")
         
         # If no repositories were found, log detailed information
         if len(repos) == 0:
-            logger.warning("No repositories found! User may not have any public repositories.")
-            logger.info(f"User profile: Public repos count from GitHub: {user_data.get('public_repos', 0)}")
+            logger.warning(f"No repositories found! User {login} may not have any public repositories.")
         
         return repos
     except Exception as e:
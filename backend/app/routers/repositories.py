@@ -1,30 +1,67 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict
 from ..models.models import ScanRequest, ScanResponse, ImplementationRequest, ImplementationResponse
 from ..mock import external_server
+from ..services import implementation_runner, progress_events, recommendation, scan_engine
+
+# Scans run on the real scan engine with SCAN_ENGINE=real, and are mocked otherwise
+scans = scan_engine.get_engine() if scan_engine.SCAN_ENGINE == "real" else external_server
+# Implementations run on the job runner with IMPLEMENTATION_ENGINE=real, and are mocked otherwise
+implementations = (implementation_runner.get_runner() if implementation_runner.IMPLEMENTATION_ENGINE == "real"
+                   else external_server)
 
 router = APIRouter(
     prefix="/api/repositories",
     tags=["repositories"],
 )
 
+# Keep proxies from buffering streamed responses
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def scan_event(scan_id: str) -> Dict[str, Any]:
+    """The status of a scan as sent in its events, with every field of ScanResponse."""
+    result = scans.get_scan_status(scan_id)
+    if result["status"] == "not_found":
+        return result
+    return ScanResponse(**result).model_dump()
+
+def implementation_event(implementation_id: str) -> Dict[str, Any]:
+    """The status of an implementation as sent in its events, with every field of ImplementationResponse."""
+    result = implementations.get_implementation_status(implementation_id)
+    if result["status"] == "not_found":
+        return result
+    return ImplementationResponse(**result).model_dump()
+
 @router.post("/scan", response_model=ScanResponse)
 async def scan_repository(scan_request: ScanRequest):
     """
     Initiate a scan of a GitHub repository to find good first issues.
-    This endpoint sends the repository URL to the external server
-    and returns a scan ID that can be used to check the status.
+    This endpoint queues the scan and returns a scan ID
+    that can be used to check the status.
     """
-    # Call the mock external server API
-    result = external_server.start_scan(scan_request.repository_url)
+    try:
+        result = scans.start_scan(scan_request.repository_url)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except scan_engine.ScanQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     return result
 
 @router.get("/scan/{scan_id}", response_model=ScanResponse)
 async def get_scan_status(scan_id: str):
     """
     Check the status of a repository scan.
-    Once the scan is completed, this will return a list of issues.
+    While the scan runs, this reports its progress;
+    once it is completed, this will return a list of issues.
     """
-    result = external_server.get_scan_status(scan_id)
+    result = scans.get_scan_status(scan_id)
     if result["status"] == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -32,6 +69,56 @@ async def get_scan_status(scan_id: str):
         )
     return result
 
+@router.get("/scan/{scan_id}/recommendation")
+async def stream_scan_recommendation(scan_id: str):
+    """
+    Stream the LLM recommendation for the issues of a completed scan.
+    The text is sent as plain text in chunks as the model generates it,
+    so the first words arrive long before the whole recommendation is done.
+    """
+    result = scans.get_scan_status(scan_id)
+    if result["status"] == "not_found":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    if result["status"] != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Scan not completed"
+        )
+    if not recommendation.llm_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="LLM recommendations are not configured"
+        )
+    
+    repo_key = scans.active_scans[scan_id]["repo_key"]
+    return StreamingResponse(
+        recommendation.stream_recommendation(result["issues"], repo_key),
+        media_type="text/plain; charset=utf-8",
+        headers=STREAM_HEADERS
+    )
+
+@router.get("/scan/{scan_id}/events")
+async def stream_scan_events(scan_id: str):
+    """
+    Stream the status of a repository scan as server-sent events.
+    A "status" event, shaped like the scan status response, is sent whenever
+    the status, progress or best issues so far change, until the scan ends.
+    """
+    if scans.get_scan_status(scan_id)["status"] == "not_found":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
+        )
+    
+    return StreamingResponse(
+        progress_events.status_events(lambda: scan_event(scan_id)),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
+
 @router.post("/implement", response_model=ImplementationResponse)
 async def implement_issue(implementation_request: ImplementationRequest):
     """
@@ -39,16 +126,44 @@ async def implement_issue(implementation_request: ImplementationRequest):
     This endpoint sends the selected issue to the external server
     and returns an implementation ID that can be used to check the status.
     """
-    result = external_server.start_implementation(
-        implementation_request.scan_id,
-        implementation_request.issue_id
-    )
-    if result.get("status") == "scan_not_found":
+    scan = scans.get_scan_status(implementation_request.scan_id)
+    if scan["status"] == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found"
         )
-    return result
+    
+    if implementations is external_server:
+        result = external_server.start_implementation(
+            implementation_request.scan_id,
+            implementation_request.issue_id,
+            require_scan=scans is external_server
+        )
+        if result.get("status") == "scan_not_found":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Scan not found"
+            )
+        return result
+    
+    issue = next((issue for issue in scan["issues"] or [] if issue["id"] == implementation_request.issue_id), None)
+    if issue is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Issue not found in this scan"
+        )
+    try:
+        return implementations.start_implementation(
+            implementation_request.scan_id,
+            issue,
+            scans.active_scans[implementation_request.scan_id]["repo_key"],
+            priority=implementation_request.priority
+        )
+    except implementation_runner.ImplementationQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
 
 @router.get("/implement/{implementation_id}", response_model=ImplementationResponse)
 async def get_implementation_status(implementation_id: str):
@@ -56,10 +171,49 @@ async def get_implementation_status(implementation_id: str):
     Check the status of an issue implementation.
     Once the implementation is completed, this will return PR details.
     """
-    result = external_server.get_implementation_status(implementation_id)
+    result = implementations.get_implementation_status(implementation_id)
+    if result["status"] == "not_found":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Implementation not found"
+        )
+    return result
+
+@router.post("/implement/{implementation_id}/cancel", response_model=ImplementationResponse)
+async def cancel_implementation(implementation_id: str):
+    """
+    Cancel an issue implementation that is queued or in progress.
+    Running agents are stopped, so the status may show the
+    implementation as cancelled only a moment later.
+    """
+    result = implementations.cancel_implementation(implementation_id)
     if result["status"] == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Implementation not found"
         )
-    return result 
\ No newline at end of file
+    if result["status"] in ("completed", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Implementation already finished"
+        )
+    return result
+
+@router.get("/implement/{implementation_id}/events")
+async def stream_implementation_events(implementation_id: str):
+    """
+    Stream the status of an issue implementation as server-sent events.
+    A "status" event, shaped like the implementation status response, is sent
+    whenever the status or progress changes, until the implementation ends.
+    """
+    if implementations.get_implementation_status(implementation_id)["status"] == "not_found":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Implementation not found"
+        )
+    
+    return StreamingResponse(
+        progress_events.status_events(lambda: implementation_event(implementation_id)),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The GitHub HTTP helpers are shared with the CLI scripts at the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from github_http import close_session, get_session  # noqa: E402
@@ -0,0 +1,332 @@
+"""
+In-process runner that implements issues as pull requests in the background.
+
+Each implementation job hands one issue to an agent backend:
+
+- FakeAgent pretends to work for IMPLEMENTATION_FAKE_SECONDS and opens a made-up
+  pull request, for development and tests.
+- CommandAgent runs IMPLEMENTATION_COMMAND as a local subprocess, one per job.
+
+Jobs wait in a priority queue (higher `priority` first, then first come first
+served) and run on IMPLEMENTATION_WORKERS worker threads, by default one per core.
+At most IMPLEMENTATION_PER_REPO jobs of one repository run at a time, so a long
+queue for one repository cannot hold every worker while other repositories wait.
+Queued and running jobs can be cancelled; a job running longer than
+IMPLEMENTATION_TIMEOUT seconds is stopped and marked as failed.
+
+The API uses this runner when IMPLEMENTATION_ENGINE=real and the mock external
+server otherwise. IMPLEMENTATION_AGENT picks the backend ("fake" or "command").
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .store import open_store
+
+logger = logging.getLogger(__name__)
+
+IMPLEMENTATION_ENGINE = os.environ.get("IMPLEMENTATION_ENGINE", "mock")
+IMPLEMENTATION_AGENT = os.environ.get("IMPLEMENTATION_AGENT", "fake")
+IMPLEMENTATION_WORKERS = int(os.environ.get("IMPLEMENTATION_WORKERS", os.cpu_count() or 1))
+IMPLEMENTATION_PER_REPO = int(os.environ.get("IMPLEMENTATION_PER_REPO", 1))
+IMPLEMENTATION_QUEUE_SIZE = int(os.environ.get("IMPLEMENTATION_QUEUE_SIZE", 100))
+IMPLEMENTATION_TIMEOUT = int(os.environ.get("IMPLEMENTATION_TIMEOUT", 1800))
+# Command line of the command agent, and how long the fake agent takes per job
+IMPLEMENTATION_COMMAND = os.environ.get("IMPLEMENTATION_COMMAND", "")
+IMPLEMENTATION_FAKE_SECONDS = float(os.environ.get("IMPLEMENTATION_FAKE_SECONDS", 10))
+
+# Seconds between checks for cancellation and timeouts while an agent works
+CHECK_INTERVAL = 0.1
+
+class ImplementationQueueFull(Exception):
+    """Raised when an implementation is started while the queue is full."""
+
+class JobCancelled(Exception):
+    """Raised by an agent that stopped because its job was cancelled."""
+
+class JobTimeout(Exception):
+    """Raised by an agent that stopped because its job ran past its deadline."""
+
+def check_job(cancelled: threading.Event, deadline: float) -> None:
+    """Raise JobCancelled or JobTimeout if the job should stop."""
+    if cancelled.is_set():
+        raise JobCancelled()
+    if time.time() > deadline:
+        raise JobTimeout()
+
+class FakeAgent:
+    """Agent that waits `duration` seconds, reporting progress, and makes up a pull request."""
+
+    def __init__(self, duration: float = IMPLEMENTATION_FAKE_SECONDS):
+        self.duration = duration
+
+    def run(self, job: Dict[str, Any], report: Callable[[int], None],
+            cancelled: threading.Event, deadline: float) -> Dict[str, Any]:
+        start = time.time()
+        percent = 0
+        while time.time() - start < self.duration:
+            check_job(cancelled, deadline)
+            new_percent = int(100 * (time.time() - start) / self.duration)
+            if new_percent != percent:
+                percent = new_percent
+                report(percent)
+            cancelled.wait(min(CHECK_INTERVAL, self.duration))
+
+        issue = job["issue"]
+        return {
+            "id": 100000 + issue["id"],
+            "title": issue["title"],
+            "url": f"https://github.com/{job['repo_key']}/pull/{100000 + issue['id']}",
+            "status": "open",
+        }
+
+class CommandAgent:
+    """
+    Agent that runs a command per job.
+
+    `{repo_key}`, `{repo_url}`, `{issue_id}`, `{issue_url}`, `{issue_title}` and
+    `{implementation_id}` in the arguments of `command` are replaced with the job's
+    values. The command must exit with status 0 and print the pull request as a JSON
+    object ({"id", "title", "url", "status"}) on the last line of its output.
+    """
+
+    def __init__(self, command: str = IMPLEMENTATION_COMMAND):
+        if not command:
+            raise ValueError("IMPLEMENTATION_COMMAND is required for the command agent")
+        self.args = shlex.split(command)
+
+    def run(self, job: Dict[str, Any], report: Callable[[int], None],
+            cancelled: threading.Event, deadline: float) -> Dict[str, Any]:
+        issue = job["issue"]
+        fields = {
+            "repo_key": job["repo_key"],
+            "repo_url": f"https://github.com/{job['repo_key']}",
+            "issue_id": issue["id"],
+            "issue_url": issue["url"],
+            "issue_title": issue["title"],
+            "implementation_id": job["implementation_id"],
+        }
+        args = []
+        for arg in self.args:
+            # Plain replacement, so other braces (a JSON argument, say) are left alone
+            for name, value in fields.items():
+                arg = arg.replace(f"{{{name}}}", str(value))
+            args.append(arg)
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            while True:
+                try:
+                    # Keeps draining the pipes so a chatty command never blocks on a full one
+                    stdout, stderr = process.communicate(timeout=CHECK_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    check_job(cancelled, deadline)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+
+        if process.returncode != 0:
+            raise RuntimeError(f"Command exited with status {process.returncode}: {stderr.strip()[-500:]}")
+        lines = stdout.strip().splitlines()
+        return json.loads(lines[-1]) if lines else {}
+
+def create_agent(name: str = IMPLEMENTATION_AGENT):
+    """Create the agent backend called `name`."""
+    if name == "fake":
+        return FakeAgent()
+    if name == "command":
+        return CommandAgent()
+    raise ValueError(f"Unknown IMPLEMENTATION_AGENT {name!r}, expected 'fake' or 'command'")
+
+class ImplementationRunner:
+    """Runs implementation jobs on a bounded worker pool and keeps their state in `jobs`."""
+
+    def __init__(self, agent=None, max_workers: int = IMPLEMENTATION_WORKERS,
+                 per_repo: int = IMPLEMENTATION_PER_REPO, max_queued: int = IMPLEMENTATION_QUEUE_SIZE,
+                 timeout: float = IMPLEMENTATION_TIMEOUT):
+        self.agent = agent if agent is not None else create_agent()
+        self.max_workers = max_workers
+        self.per_repo = per_repo
+        self.max_queued = max_queued
+        self.timeout = timeout
+        # Jobs by id; values read from the store are copies
+        self.jobs = open_store("implementations")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="implementation")
+        self._lock = threading.Lock()
+        # Queued jobs as (-priority, sequence, job id, repository) entries; cancelled
+        # jobs leave `_queued` at once and the heap when they reach its top
+        self._queue: List[Tuple[int, int, str, str]] = []
+        self._queued = set()
+        self._sequence = itertools.count()
+        self._running = 0
+        self._running_per_repo: Counter = Counter()
+        self._cancel_events: Dict[str, threading.Event] = {}
+
+    def start_implementation(self, scan_id: str, issue: Dict[str, Any], repo_key: str,
+                             priority: int = 0) -> Dict[str, Any]:
+        """
+        Queue the implementation of an issue (in the API's Issue shape) of a repository.
+
+        Raises ImplementationQueueFull when too many jobs are waiting.
+        """
+        with self._lock:
+            if len(self._queued) >= self.max_queued:
+                raise ImplementationQueueFull("Too many implementations waiting, try again later")
+            implementation_id = str(uuid.uuid4())
+            self.jobs[implementation_id] = {
+                "implementation_id": implementation_id,
+                "scan_id": scan_id,
+                "issue_id": issue["id"],
+                "issue": issue,
+                "repo_key": repo_key,
+                "priority": priority,
+                "status": "queued",
+                "start_time": time.time(),
+                "end_time": None,
+                "pull_request": None,
+                "error": None,
+                "progress": {"stage": "queued", "percent": 0},
+            }
+            heapq.heappush(self._queue, (-priority, next(self._sequence), implementation_id, repo_key))
+            self._queued.add(implementation_id)
+            self._dispatch()
+        return {"implementation_id": implementation_id, "status": "queued"}
+
+    def get_implementation_status(self, implementation_id: str) -> Dict[str, Any]:
+        """Get the status of a job, in the same shape as the mock external server."""
+        job = self.jobs.get(implementation_id)
+        if job is None:
+            return {"status": "not_found"}
+        return {
+            "implementation_id": implementation_id,
+            "status": job["status"],
+            "pull_request": job["pull_request"] if job["status"] == "completed" else None,
+            "progress": job["progress"],
+            "error": job["error"],
+        }
+
+    def cancel_implementation(self, implementation_id: str) -> Dict[str, Any]:
+        """Cancel a queued or running job; finished jobs are left as they are. Returns the job's status."""
+        with self._lock:
+            if implementation_id in self._queued:
+                self._queued.discard(implementation_id)
+                self._finish(implementation_id, "cancelled", error="Cancelled")
+            elif implementation_id in self._cancel_events:
+                # The agent notices within CHECK_INTERVAL and the job ends as cancelled
+                self._cancel_events[implementation_id].set()
+        return self.get_implementation_status(implementation_id)
+
+    def _dispatch(self) -> None:
+        """Start the best queued jobs that fit within the global and per-repository limits. Needs `_lock`."""
+        skipped = []
+        while self._queue and self._running < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            _, _, implementation_id, repo_key = entry
+            if implementation_id not in self._queued:
+                continue
+            if self._running_per_repo[repo_key] >= self.per_repo:
+                skipped.append(entry)
+                continue
+
+            self._queued.discard(implementation_id)
+            self._running += 1
+            self._running_per_repo[repo_key] += 1
+            self._cancel_events[implementation_id] = threading.Event()
+            self._executor.submit(self._run, implementation_id, repo_key)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    def _update(self, implementation_id: str, **fields: Any) -> None:
+        job = self.jobs[implementation_id]
+        job.update(fields)
+        self.jobs[implementation_id] = job
+
+    def _finish(self, implementation_id: str, status: str, **fields: Any) -> None:
+        self._update(implementation_id, status=status, end_time=time.time(),
+                     progress={"stage": status, "percent": 100}, **fields)
+
+    def _run(self, implementation_id: str, repo_key: str) -> None:
+        cancelled = self._cancel_events[implementation_id]
+        try:
+            self._update(implementation_id, status="in_progress", progress={"stage": "implementing", "percent": 0})
+            pull_request = self.agent.run(
+                self.jobs[implementation_id],
+                lambda percent: self._update(implementation_id, progress={"stage": "implementing", "percent": percent}),
+                cancelled, time.time() + self.timeout
+            )
+            self._finish(implementation_id, "completed", pull_request=pull_request)
+        except JobCancelled:
+            self._finish(implementation_id, "cancelled", error="Cancelled")
+        except JobTimeout:
+            logger.warning(f"Implementation {implementation_id} of {repo_key} timed out")
+            self._finish(implementation_id, "failed", error=f"Timed out after {self.timeout:g} seconds")
+        except Exception:
+            logger.exception(f"Implementation {implementation_id} of {repo_key} failed")
+            self._finish(implementation_id, "failed", error="The coding agent failed")
+        finally:
+            with self._lock:
+                del self._cancel_events[implementation_id]
+                self._running -= 1
+                self._running_per_repo[repo_key] -= 1
+                self._dispatch()
+
+    def sweep(self, retention: float) -> Dict[str, int]:
+        """
+        Drop the jobs that finished more than `retention` seconds ago.
+        Returns how many jobs are left and were dropped.
+        """
+        counts = {"implementations": 0, "expired": 0}
+        now = time.time()
+        for implementation_id in list(self.jobs):
+            job = self.jobs.get(implementation_id)
+            if job is None:
+                continue
+            if job["end_time"] is not None and now - job["end_time"] > retention:
+                self.jobs.pop(implementation_id, None)
+                counts["expired"] += 1
+            else:
+                counts["implementations"] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Drop queued jobs and stop the running ones."""
+        with self._lock:
+            self._queued.clear()
+            for cancelled in self._cancel_events.values():
+                cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_runner: Optional[ImplementationRunner] = None
+_runner_lock = threading.Lock()
+
+def get_runner() -> ImplementationRunner:
+    """Return the process-wide implementation runner, creating it on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ImplementationRunner()
+        return _runner
+
+def sweep(retention: float) -> Optional[Dict[str, int]]:
+    """Sweep the implementation runner if it was started; see ImplementationRunner.sweep."""
+    with _runner_lock:
+        runner = _runner
+    return runner.sweep(retention) if runner is not None else None
+
+def shutdown() -> None:
+    """Shut the implementation runner down if it was started."""
+    with _runner_lock:
+        if _runner is not None:
+            _runner.shutdown()
@@ -0,0 +1,37 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict
+
+# Statuses after which a job no longer changes
+FINAL_STATUSES = ("completed", "failed", "cancelled", "not_found")
+
+# Seconds between status checks, and between keep-alive comments on an unchanged status
+CHECK_INTERVAL = 0.25
+HEARTBEAT_INTERVAL = 15.0
+
+async def status_events(get_status: Callable[[], Dict[str, Any]],
+                        interval: float = CHECK_INTERVAL,
+                        heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[str]:
+    """
+    Yield server-sent events for a job, one "status" event per change of `get_status()`.
+
+    Status checks are in-process dictionary reads, so only changes go over the wire.
+    The stream ends after the job reaches a final status. Keep-alive comments stop
+    proxies from closing a quiet connection.
+    """
+    loop = asyncio.get_running_loop()
+    last_status = None
+    last_sent = loop.time()
+    while True:
+        job_status = get_status()
+        if job_status != last_status:
+            yield f"event: status\ndata: {json.dumps(job_status)}\n\n"
+            last_status = job_status
+            last_sent = loop.time()
+        elif loop.time() - last_sent >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_sent = loop.time()
+
+        if job_status.get("status") in FINAL_STATUSES:
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterator, List
+
+import requests
+
+from . import github  # noqa: F401  Makes the CLI modules at the repository root importable
+import extract_issues  # noqa: E402
+
+def llm_available() -> bool:
+    """Whether an OpenAI API key is configured."""
+    return bool(extract_issues.OPENAI_API_KEY)
+
+def to_formatted_issue(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an issue in the API's Issue shape into the shape the extractor formats issues in."""
+    return {
+        "title": issue["title"],
+        "number": issue["id"],
+        "url": issue["url"],
+        "labels": [],
+        "comments": [{"index": 0, "text": issue.get("description") or ""}],
+    }
+
+def stream_recommendation(issues: List[Dict[str, Any]], repo_key: str) -> Iterator[str]:
+    """
+    Yield the LLM recommendation for a scan's issues as it is generated.
+
+    The response has already started when the first chunk is sent, so an API error is
+    reported at the end of the text instead of through the status code.
+    """
+    repo_owner, _, repo_name = repo_key.partition("/")
+    formatted_issues = [to_formatted_issue(issue) for issue in issues]
+    prompt, _ = extract_issues.build_recommendation_prompt(formatted_issues, repo_owner, repo_name)
+    try:
+        yield from extract_issues.stream_openai(prompt)
+    except requests.exceptions.RequestException as e:
+        yield f"\n\n[Error calling OpenAI API: {e}]"
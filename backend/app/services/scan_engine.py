@@ -0,0 +1,274 @@
+"""
+In-process engine that scans repositories for good first issues in the background.
+
+Scans run the extract_issues pipeline (fetch the open issues, format them with their
+comments, rank them with issue_ranker) on a bounded pool of worker threads, so the
+API never blocks on GitHub. Scans beyond the busy workers wait in a queue of limited
+size; when that is full, new scans are refused. Each scan keeps progress counters
+while it runs, and the best issues seen so far: issues are ranked in batches as their
+comments arrive, so partial results are available long before the scan completes.
+
+Scans are single-flight per repository: starting a scan of a repository that is
+already being scanned, or that was scanned less than SCAN_FRESHNESS_SECONDS ago,
+returns that scan instead of doing the work again.
+
+The API uses this engine when SCAN_ENGINE=real and the mock external server
+otherwise. Pool and queue sizes come from SCAN_WORKERS and SCAN_QUEUE_SIZE.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from . import github  # noqa: F401  Makes the CLI modules at the repository root importable
+import extract_issues  # noqa: E402
+from github_http import ensure_pool_size  # noqa: E402
+from issue_filters import IssueFilter  # noqa: E402
+from issue_ranker import rank_issues  # noqa: E402
+
+from .store import open_store
+
+logger = logging.getLogger(__name__)
+
+SCAN_ENGINE = os.environ.get("SCAN_ENGINE", "mock")
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", 2))
+SCAN_QUEUE_SIZE = int(os.environ.get("SCAN_QUEUE_SIZE", 20))
+# Comment requests in flight per scan, and issues reported per completed scan
+SCAN_COMMENT_CONCURRENCY = int(os.environ.get("SCAN_COMMENT_CONCURRENCY", 8))
+SCAN_MAX_RESULTS = int(os.environ.get("SCAN_MAX_RESULTS", 10))
+# Seconds a completed scan is reused for new scans of the same repository
+SCAN_FRESHNESS_SECONDS = int(os.environ.get("SCAN_FRESHNESS_SECONDS", 600))
+
+# Characters of an issue description returned by the API
+DESCRIPTION_CHARS = 500
+# Formatted issues ranked at a time into a running scan's results
+RANKING_BATCH = 50
+
+class ScanQueueFull(Exception):
+    """Raised when a scan is started while all workers are busy and the queue is full."""
+
+def to_api_issue(issue: Dict[str, Any], ranking: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a formatted issue and its ranking into the API's Issue shape."""
+    description = issue["comments"][0]["text"] if issue["comments"] else ""
+    if len(description) > DESCRIPTION_CHARS:
+        description = description[:DESCRIPTION_CHARS].rstrip() + "..."
+    return {
+        "id": issue["number"],
+        "title": issue["title"],
+        "description": description,
+        "complexity": ranking["complexity"],
+        "estimated_time": ranking["estimated_time"],
+        "url": issue["url"],
+    }
+
+class ScanEngine:
+    """Runs scans on a bounded worker pool and keeps their state in `active_scans`."""
+
+    def __init__(self, max_workers: int = SCAN_WORKERS, max_queued: int = SCAN_QUEUE_SIZE,
+                 comment_concurrency: int = SCAN_COMMENT_CONCURRENCY, max_results: int = SCAN_MAX_RESULTS,
+                 freshness: float = SCAN_FRESHNESS_SECONDS):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.comment_concurrency = comment_concurrency
+        self.max_results = max_results
+        self.freshness = freshness
+        # Scans by id, and the latest scan of each repository; values read from the stores are copies
+        self.active_scans = open_store("scans")
+        self.latest_scans = open_store("latest_scans")
+        # How many scan requests were served by an existing scan
+        self.coalesced = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self._lock = threading.Lock()
+        self._unfinished = 0
+        # Comment fetches of all running scans share the GitHub connection pool
+        ensure_pool_size(max_workers * comment_concurrency)
+
+    def start_scan(self, repo_url: str) -> Dict[str, Any]:
+        """
+        Queue a scan of a repository, or attach to a running or fresh scan of it.
+
+        Raises ValueError for URLs that are not GitHub repositories and ScanQueueFull
+        when too many scans are waiting.
+        """
+        repo_owner, repo_name = extract_issues.parse_github_url(repo_url)
+        if repo_name.endswith(".git"):
+            repo_name = repo_name[:-len(".git")]
+        # GitHub owner and repository names are case-insensitive
+        repo_key = f"{repo_owner}/{repo_name}".lower()
+
+        with self._lock:
+            scan_id = self.latest_scans.get(repo_key)
+            scan = self.active_scans.get(scan_id)
+            if scan and (scan["status"] in ("queued", "in_progress")
+                         or scan["status"] == "completed" and time.time() - scan["end_time"] <= self.freshness):
+                self.coalesced += 1
+                return self._status(scan_id, scan)
+
+            if self._unfinished >= self.max_workers + self.max_queued:
+                raise ScanQueueFull("Too many scans in progress, try again later")
+            self._unfinished += 1
+            scan_id = str(uuid.uuid4())
+            self.latest_scans[repo_key] = scan_id
+            self.active_scans[scan_id] = {
+                "repo_url": repo_url,
+                "repo_key": repo_key,
+                "status": "queued",
+                "start_time": time.time(),
+                "end_time": None,
+                "issues": None,
+                "error": None,
+                "progress": {"stage": "queued", "issues_found": 0, "issues_processed": 0},
+            }
+
+        self._executor.submit(self._run, scan_id, repo_owner, repo_name)
+        return {"scan_id": scan_id, "status": "queued"}
+
+    def get_scan_status(self, scan_id: str) -> Dict[str, Any]:
+        """Get the status of a scan, in the same shape as the mock external server."""
+        with self._lock:
+            scan = self.active_scans.get(scan_id)
+            if scan is None:
+                return {"status": "not_found"}
+            return self._status(scan_id, scan)
+
+    @staticmethod
+    def _status(scan_id: str, scan: Dict[str, Any]) -> Dict[str, Any]:
+        # While the scan runs, `issues` holds the best issues ranked so far
+        return {
+            "scan_id": scan_id,
+            "status": scan["status"],
+            "issues": list(scan["issues"]) if scan["issues"] is not None else None,
+            "error": scan["error"],
+            "progress": dict(scan["progress"], percent=ScanEngine._percent(scan)),
+        }
+
+    @staticmethod
+    def _percent(scan: Dict[str, Any]) -> int:
+        """Rough completion percentage: listing the issues, then fetching their comments, takes most of a scan."""
+        progress = scan["progress"]
+        if scan["status"] in ("completed", "failed"):
+            return 100
+        if progress["stage"] == "fetching":
+            return 5 + 90 * progress["issues_processed"] // max(progress["issues_found"], 1)
+        return 0
+
+    def _update(self, scan_id: str, **fields: Any) -> None:
+        with self._lock:
+            scan = self.active_scans[scan_id]
+            scan.update(fields)
+            self.active_scans[scan_id] = scan
+
+    def _advance(self, scan_id: str, counter: Optional[str] = None, amount: int = 1,
+                 stage: Optional[str] = None) -> None:
+        with self._lock:
+            scan = self.active_scans[scan_id]
+            if counter:
+                scan["progress"][counter] += amount
+            if stage:
+                scan["progress"]["stage"] = stage
+            self.active_scans[scan_id] = scan
+
+    def _rank_batch(self, scan_id: str, best: List[Tuple[float, Dict[str, Any]]],
+                    batch: List[Dict[str, Any]]) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Rank a batch of formatted issues and merge it into the scan's best issues so far.
+
+        Scores do not depend on the other issues, so merging batches gives the same
+        results as ranking all issues at once; issues with equal scores keep their order.
+        """
+        scored = [(ranking["score"], to_api_issue(issue, ranking))
+                  for issue, ranking in zip(batch, rank_issues(batch))]
+        best = heapq.nlargest(self.max_results, best + scored, key=lambda pair: pair[0])
+        self._update(scan_id, issues=[api_issue for _, api_issue in best])
+        return best
+
+    def _run(self, scan_id: str, repo_owner: str, repo_name: str) -> None:
+        self._update(scan_id, status="in_progress")
+        self._advance(scan_id, stage="fetching")
+        try:
+            issues = extract_issues.iter_all_issues(
+                repo_owner, repo_name, issue_filter=IssueFilter(exclude_pull_requests=True),
+                on_page=lambda page, page_issues: self._advance(scan_id, "issues_found", len(page_issues))
+            )
+            best: List[Tuple[float, Dict[str, Any]]] = []
+            batch: List[Dict[str, Any]] = []
+            for issue in extract_issues.iter_formatted_issues(issues, repo_owner, repo_name, self.comment_concurrency):
+                batch.append(issue)
+                if len(batch) >= RANKING_BATCH:
+                    best = self._rank_batch(scan_id, best, batch)
+                    batch = []
+                self._advance(scan_id, "issues_processed")
+            best = self._rank_batch(scan_id, best, batch)
+
+            self._update(scan_id, status="completed", end_time=time.time())
+            self._advance(scan_id, stage="completed")
+        # iter_all_issues exits the process on a failed listing, as the CLI wants
+        except (requests.exceptions.RequestException, ValueError, SystemExit) as e:
+            logger.warning(f"Scan {scan_id} of {repo_owner}/{repo_name} failed: {e!r}")
+            self._update(scan_id, status="failed", error="Could not fetch the repository's issues", end_time=time.time())
+            self._advance(scan_id, stage="failed")
+        except Exception:
+            logger.exception(f"Scan {scan_id} of {repo_owner}/{repo_name} failed")
+            self._update(scan_id, status="failed", error="Internal error while scanning", end_time=time.time())
+            self._advance(scan_id, stage="failed")
+        finally:
+            with self._lock:
+                self._unfinished -= 1
+
+    def sweep(self, retention: float) -> Dict[str, int]:
+        """
+        Drop the scans that finished more than `retention` seconds ago.
+        Returns how many scans are left and were dropped.
+        """
+        counts = {"scans": 0, "expired": 0}
+        now = time.time()
+        # Finished scans are never written again, so only the repository index needs the lock
+        for scan_id in list(self.active_scans):
+            scan = self.active_scans.get(scan_id)
+            if scan is None:
+                continue
+            if scan["end_time"] is not None and now - scan["end_time"] > retention:
+                self.active_scans.pop(scan_id, None)
+                counts["expired"] += 1
+            else:
+                counts["scans"] += 1
+
+        for repo_key in list(self.latest_scans):
+            with self._lock:
+                if self.latest_scans.get(repo_key) not in self.active_scans:
+                    self.latest_scans.pop(repo_key, None)
+        return counts
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop queued scans; running scans finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_engine: Optional[ScanEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> ScanEngine:
+    """Return the process-wide scan engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ScanEngine()
+        return _engine
+
+def shutdown() -> None:
+    """Shut the scan engine down if it was started."""
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+
+def sweep(retention: float) -> Optional[Dict[str, int]]:
+    """Sweep the scan engine if it was started; see ScanEngine.sweep."""
+    with _engine_lock:
+        engine = _engine
+    return engine.sweep(retention) if engine is not None else None
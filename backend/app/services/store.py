@@ -0,0 +1,191 @@
+"""
+Key-value stores for the API's state: scans, implementations and sessions.
+
+Both backends are mutable mappings of string keys to JSON-serializable values, so
+they replace the plain dicts the routers and services used before:
+
+- MemoryStore keeps the entries in the process, like a dict.
+- SQLiteStore keeps them in a table of a SQLite database in WAL mode, so they
+  survive restarts and can be shared by several uvicorn workers on one host.
+
+An entry expires `ttl` seconds after it was last written, and once a store holds
+more than `max_entries` entries the least recently written ones are evicted. Values
+read from a store are copies: write a changed value back for the change to be kept.
+
+`open_store` picks the backend from STORE_BACKEND ("memory", the default, or
+"sqlite") and the database file from STORE_PATH. Unless a store sets its own, entries
+expire after STORE_TTL_SECONDS and each store keeps at most STORE_MAX_ENTRIES.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+STORE_BACKEND = os.environ.get("STORE_BACKEND", "memory")
+STORE_PATH = os.environ.get("STORE_PATH", "autopull.sqlite3")
+STORE_TTL_SECONDS = int(os.environ.get("STORE_TTL_SECONDS", 86400))
+STORE_MAX_ENTRIES = int(os.environ.get("STORE_MAX_ENTRIES", 10000))
+
+# Writes to a SQLite store between two evictions of the entries over its limit
+EVICTION_INTERVAL = 64
+
+# Every store opened by open_store, for purge_expired_stores
+_stores = []
+
+class MemoryStore(MutableMapping):
+    """In-process store; entries are kept in write order so the oldest are evicted first."""
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            expires, value = self._entries[key]
+            if expires is not None and expires <= time.time():
+                del self._entries[key]
+                raise KeyError(key)
+            # Round-trip through JSON so callers get a copy, as from SQLiteStore
+            return json.loads(value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, json.dumps(value))
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        now = time.time()
+        with self._lock:
+            keys = [key for key, (expires, _) in self._entries.items() if expires is None or expires > now]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were dropped."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires, _) in self._entries.items() if expires is not None and expires <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+class SQLiteStore(MutableMapping):
+    """Store kept in table `name` of the SQLite database at `path`."""
+
+    def __init__(self, path: str, name: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS "{name}" (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    expires REAL
+                );
+                CREATE INDEX IF NOT EXISTS "{name}_updated" ON "{name}" (updated);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay in the thread that opened them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other workers proceed while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __getitem__(self, key: str) -> Any:
+        row = self._conn().execute(
+            f'SELECT value FROM "{self.name}" WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._conn() as conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO "{self.name}" (key, value, updated, expires) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, expires)
+            )
+        self._writes += 1
+        if self.max_entries is not None and self._writes % EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def __delitem__(self, key: str) -> None:
+        with self._conn() as conn:
+            deleted = conn.execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,)).rowcount
+        if not deleted:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._conn().execute(
+            f'SELECT key FROM "{self.name}" WHERE expires IS NULL OR expires > ?', (time.time(),)
+        ).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            f'SELECT COUNT(*) FROM "{self.name}" WHERE expires IS NULL OR expires > ?', (time.time(),)
+        ).fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop the least recently written entries over `max_entries`; returns how many were dropped."""
+        if self.max_entries is None:
+            return 0
+        with self._conn() as conn:
+            return conn.execute(
+                f'DELETE FROM "{self.name}" WHERE key IN '
+                f'(SELECT key FROM "{self.name}" ORDER BY updated DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were dropped."""
+        with self._conn() as conn:
+            return conn.execute(
+                f'DELETE FROM "{self.name}" WHERE expires IS NOT NULL AND expires <= ?', (time.time(),)
+            ).rowcount
+
+def open_store(name: str, ttl: Optional[float] = STORE_TTL_SECONDS,
+               max_entries: Optional[int] = STORE_MAX_ENTRIES) -> MutableMapping:
+    """Open the store called `name` on the backend selected by STORE_BACKEND."""
+    if STORE_BACKEND == "sqlite":
+        store = SQLiteStore(STORE_PATH, name, ttl=ttl, max_entries=max_entries)
+    elif STORE_BACKEND == "memory":
+        store = MemoryStore(ttl=ttl, max_entries=max_entries)
+    else:
+        raise ValueError(f"Unknown STORE_BACKEND {STORE_BACKEND!r}, expected 'memory' or 'sqlite'")
+    _stores.append(store)
+    return store
+
+def purge_expired_stores() -> int:
+    """Drop the expired entries of every opened store; returns how many were dropped."""
+    return sum(store.purge_expired() for store in _stores)
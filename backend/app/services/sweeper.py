@@ -0,0 +1,57 @@
+"""
+Background task that keeps the job stores small on a long-running API process.
+
+Every SWEEP_INTERVAL_SECONDS it completes the mock jobs that are due (they otherwise
+only change state when their status is requested), drops scans and implementations
+that finished more than JOB_RETENTION_SECONDS ago, purges expired store entries and
+logs the counts. main.py runs it for the lifetime of the app.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict
+
+from starlette.concurrency import run_in_threadpool
+
+from ..mock import external_server
+from . import implementation_runner, scan_engine, store
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = int(os.environ.get("SWEEP_INTERVAL_SECONDS", 60))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", 3600))
+
+def sweep_once(retention: float = JOB_RETENTION_SECONDS) -> Dict[str, int]:
+    """
+    Run one sweep of the mock server, the scan engine, the implementation runner and the stores.
+    Returns the jobs left, and how many were completed, expired and purged.
+    """
+    counts = external_server.sweep(retention)
+    engine_counts = scan_engine.sweep(retention)
+    if engine_counts:
+        counts["scans"] += engine_counts["scans"]
+        counts["expired"] += engine_counts["expired"]
+    runner_counts = implementation_runner.sweep(retention)
+    if runner_counts:
+        counts["implementations"] += runner_counts["implementations"]
+        counts["expired"] += runner_counts["expired"]
+    counts["purged"] = store.purge_expired_stores()
+    return counts
+
+async def run(interval: float = SWEEP_INTERVAL_SECONDS, retention: float = JOB_RETENTION_SECONDS) -> None:
+    """Sweep every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # Store access blocks (SQLite), so sweeps run in the thread pool
+            counts = await run_in_threadpool(sweep_once, retention)
+        except Exception:
+            logger.exception("Sweep failed")
+            continue
+        changed = counts["completed"] or counts["expired"] or counts["purged"]
+        logger.log(
+            logging.INFO if changed else logging.DEBUG,
+            f"Sweep: {counts['scans']} scans and {counts['implementations']} implementations kept, "
+            f"{counts['completed']} completed, {counts['expired']} expired, {counts['purged']} store entries purged"
+        )
@@ -3,7 +3,19 @@ import os
 import json
 import argparse
 import sys
+import time
+from collections import deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from github_http import backoff_delay, ensure_pool_size, get_session, set_cache_dir
+from issue_cache import IssueCache
+from issue_checkpoint import Checkpoint
+from issue_filters import SEARCH_RESULT_LIMIT, IssueFilter, page_items
+from issue_ranker import shortlist_issues
+from prompt_packer import encode_issue, pack_issues, shard_issues
+from issue_writers import open_writer, read_jsonl
+from llm_cache import LLMCache, content_key
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,6 +25,81 @@ GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
 # Get OpenAI API key from environment variables
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Base URL of the GitHub REST API; can point at a local fixture server (see fixture_server.py)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip('/')
+
+# Base URL of the OpenAI API; can point at a local stub server (see llm_stub_server.py)
+OPENAI_API_URL = os.environ.get("OPENAI_API_URL", "https://api.openai.com/v1").rstrip('/')
+
+LLM_MODEL = "gpt-4.1-mini"
+LLM_TEMPERATURE = 0.5
+LLM_SYSTEM_PROMPT = "You are a helpful assistant that analyzes GitHub issues to find the best first issues for newcomers."
+
+# Prompt tokens to spend on issues in the LLM recommendation
+DEFAULT_TOKEN_BUDGET = 50000
+
+# Issues with the best local heuristic scores that are sent to the LLM
+DEFAULT_SHORTLIST = 100
+
+# Map-reduce ranking: prompt tokens per shard, finalists kept per shard, shard calls in
+# flight, and retries per OpenAI request
+DEFAULT_SHARD_TOKEN_BUDGET = 20000
+DEFAULT_TOP_K = 3
+DEFAULT_LLM_CONCURRENCY = 4
+DEFAULT_LLM_RETRIES = 3
+
+# Keep-alive connections to the OpenAI API, shared by concurrent shard calls
+openai_session = requests.Session()
+
+# Maximum page size allowed by the GitHub REST API
+COMMENTS_PER_PAGE = 100
+
+# Issues per GraphQL page and comments fetched along with each issue; issues with more
+# comments get the rest in follow-up queries
+GRAPHQL_PAGE_SIZE = 50
+GRAPHQL_COMMENTS_PER_ISSUE = 50
+
+# The REST issue listing includes pull requests, so the GraphQL engine fetches both.
+# Only the fields format_issue_data emits are requested.
+GRAPHQL_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $pageSize: Int!, $commentsPerIssue: Int!,
+      $issuesCursor: String, $pullRequestsCursor: String, $withIssues: Boolean!, $withPullRequests: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    issues(first: $pageSize, after: $issuesCursor, states: OPEN,
+           orderBy: {field: CREATED_AT, direction: DESC}) @include(if: $withIssues) {
+      pageInfo { hasNextPage endCursor }
+      nodes { ...IssueFields }
+    }
+    pullRequests(first: $pageSize, after: $pullRequestsCursor, states: OPEN,
+                 orderBy: {field: CREATED_AT, direction: DESC}) @include(if: $withPullRequests) {
+      pageInfo { hasNextPage endCursor }
+      nodes { ...PullRequestFields }
+    }
+  }
+}
+fragment IssueFields on Issue {
+  number title body url createdAt
+  labels(first: 100) { nodes { name } }
+  comments(first: $commentsPerIssue) { pageInfo { hasNextPage endCursor } nodes { body } }
+}
+fragment PullRequestFields on PullRequest {
+  number title body url createdAt
+  labels(first: 100) { nodes { name } }
+  comments(first: $commentsPerIssue) { pageInfo { hasNextPage endCursor } nodes { body } }
+}
+"""
+
+GRAPHQL_COMMENTS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issueOrPullRequest(number: $number) {
+      ... on Issue { comments(first: 100, after: $cursor) { pageInfo { hasNextPage endCursor } nodes { body } } }
+      ... on PullRequest { comments(first: 100, after: $cursor) { pageInfo { hasNextPage endCursor } nodes { body } } }
+    }
+  }
+}
+"""
+
 def parse_github_url(url):
     """Parse a GitHub URL to get owner and repo name."""
     parts = url.strip('/').split('/')
@@ -27,9 +114,25 @@ def parse_github_url(url):
     except (ValueError, IndexError):
         raise ValueError("Could not parse GitHub URL. Format should be: https://github.com/{owner}/{repo}")
 
-def get_all_issues(repo_owner, repo_name):
-    """Get all open issues from a GitHub repository."""
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues"
+def get_all_issues(repo_owner, repo_name, state="open", since=None, issue_filter=None):
+    """
+    Get all open issues from a GitHub repository.
+
+    Pass `state="all"` and an ISO 8601 `since` timestamp to get only the issues
+    (open or closed) updated at or after that time. An IssueFilter restricts the
+    result further, using the search API when the listing cannot express it.
+    """
+    return list(iter_all_issues(repo_owner, repo_name, state=state, since=since, issue_filter=issue_filter))
+
+def iter_all_issues(repo_owner, repo_name, state="open", since=None, start_page=1, on_page=None, issue_filter=None):
+    """
+    Yield the issues of a GitHub repository page by page; see get_all_issues.
+
+    Listing starts at `start_page`. If given, `on_page(page, issues)` is called with
+    the matching issues of each page before they are yielded.
+    """
+    issue_filter = issue_filter or IssueFilter()
+    url, base_params = issue_filter.build_request(GITHUB_API_URL, repo_owner, repo_name, state=state, since=since)
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "User-Agent": "GitHub-Issues-Extractor"  # Adding User-Agent which is often required
@@ -43,14 +146,13 @@ def get_all_issues(repo_owner, repo_name):
     else:
         print("Warning: No GitHub token found. API rate limits will be lower.", file=sys.stderr)
     
-    all_issues = []
-    page = 1
+    page = start_page
     
     while True:
-        params = {"state": "open", "page": page, "per_page": 100}
+        params = dict(base_params, page=page, per_page=100)
         try:
             print(f"Requesting: {url} (page {page})", file=sys.stderr)
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             
             # Debug info to help troubleshoot
             print(f"Status code: {response.status_code}", file=sys.stderr)
@@ -59,28 +161,41 @@ def get_all_issues(repo_owner, repo_name):
             if response.status_code == 401 and GITHUB_TOKEN:
                 print("Trying with Bearer token format instead...", file=sys.stderr)
                 headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-                response = requests.get(url, headers=headers, params=params)
+                response = get_session().get(url, headers=headers, params=params)
                 print(f"Status code with Bearer format: {response.status_code}", file=sys.stderr)
             
             response.raise_for_status()
-            issues = response.json()
+            issues = page_items(response.json())
             
             if not issues:  # No more issues, break the loop
                 break
             
-            all_issues.extend(issues)
-            page += 1
-            
         except requests.exceptions.RequestException as e:
             print(f"Error fetching issues: {e}", file=sys.stderr)
             print(f"Response content: {response.text if 'response' in locals() else 'No response'}", file=sys.stderr)
             sys.exit(1)
-    
-    return all_issues
+        
+        # Check whatever could not be pushed down to the API
+        full_page = len(issues) == 100
+        issues = [issue for issue in issues if issue_filter.matches(issue)]
+        if on_page:
+            on_page(page, issues)
+        yield from issues
+        
+        if full_page and issue_filter.is_last_page(page, 100):
+            print(f"Warning: stopping at the search API limit of {SEARCH_RESULT_LIMIT} results", file=sys.stderr)
+            break
+        page += 1
 
-def get_issue_comments(repo_owner, repo_name, issue_number):
-    """Get all comments for a specific issue."""
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues/{issue_number}/comments"
+def get_issue_comments(repo_owner, repo_name, issue_number, comment_count=None):
+    """
+    Get all comments for a specific issue.
+
+    If `comment_count` (the `comments` field of the issue listing) is given, no
+    request is made for issues without comments and paging stops at the last
+    expected page instead of probing for an empty one.
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/issues/{issue_number}/comments"
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "User-Agent": "GitHub-Issues-Extractor"  # Adding User-Agent which is often required
@@ -91,16 +206,22 @@ def get_issue_comments(repo_owner, repo_name, issue_number):
     
     all_comments = []
     page = 1
+    last_page = None
+    
+    if comment_count is not None:
+        if comment_count == 0:
+            return all_comments
+        last_page = -(-comment_count // COMMENTS_PER_PAGE)  # Ceiling division
     
     while True:
-        params = {"page": page, "per_page": 100}
+        params = {"page": page, "per_page": COMMENTS_PER_PAGE}
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             
             # If unauthorized with "token" format, try again with "Bearer" format
             if response.status_code == 401 and GITHUB_TOKEN:
                 headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-                response = requests.get(url, headers=headers, params=params)
+                response = get_session().get(url, headers=headers, params=params)
             
             response.raise_for_status()
             comments = response.json()
@@ -109,124 +230,469 @@ def get_issue_comments(repo_owner, repo_name, issue_number):
                 break
             
             all_comments.extend(comments)
+            
+            # The count may be stale; a full last page means comments were added
+            # since the issue list was fetched, so keep paging in that case
+            if last_page is not None and page >= last_page and len(comments) < COMMENTS_PER_PAGE:
+                break
+            
             page += 1
             
         except requests.exceptions.RequestException as e:
+            # Failing loudly beats writing the issue without its comments; transient
+            # errors and rate limits have already been retried by the session
             print(f"Error fetching comments for issue #{issue_number}: {e}", file=sys.stderr)
-            return []
+            raise
     
     return all_comments
 
-def format_issue_data(issues, repo_owner, repo_name):
-    """Format issues and their comments into the desired structure."""
-    formatted_issues = []
+def get_repo_comments(repo_owner, repo_name, since=None):
+    """
+    Get all issue comments of a repository, grouped by issue number.
+
+    Pages through the repository-wide comments listing once instead of making a
+    request per issue. Comments in each group are in creation order, matching
+    what get_issue_comments returns. If `since` (an ISO 8601 timestamp) is given,
+    only comments updated at or after that time are returned.
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/issues/comments"
+    headers = {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "GitHub-Issues-Extractor"  # Adding User-Agent which is often required
+    }
     
-    for i, issue in enumerate(issues):
-        # Get comments for this issue
-        comments = get_issue_comments(repo_owner, repo_name, issue['number'])
-        
-        # Extract label names
-        labels = [label['name'] for label in issue.get('labels', [])]
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    
+    comments_by_number = {}
+    page = 1
+    
+    while True:
+        params = {"sort": "created", "direction": "asc", "page": page, "per_page": COMMENTS_PER_PAGE}
+        if since:
+            params["since"] = since
+        try:
+            print(f"Requesting: {url} (page {page})", file=sys.stderr)
+            response = get_session().get(url, headers=headers, params=params)
+            
+            # If unauthorized with "token" format, try again with "Bearer" format
+            if response.status_code == 401 and GITHUB_TOKEN:
+                headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+                response = get_session().get(url, headers=headers, params=params)
+            
+            response.raise_for_status()
+            comments = response.json()
+            
+            if not comments:  # No more comments, break the loop
+                break
+            
+            for comment in comments:
+                # issue_url looks like .../repos/{owner}/{repo}/issues/{number}
+                issue_number = int(comment['issue_url'].rsplit('/', 1)[-1])
+                comments_by_number.setdefault(issue_number, []).append(comment)
+            
+            if len(comments) < COMMENTS_PER_PAGE:  # Last page
+                break
+            
+            page += 1
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching repository comments: {e}", file=sys.stderr)
+            print(f"Response content: {response.text if 'response' in locals() else 'No response'}", file=sys.stderr)
+            sys.exit(1)
+    
+    return comments_by_number
+
+def run_graphql_query(query, variables):
+    """Run a GitHub GraphQL query and return its `data`, raising on errors."""
+    headers = {
+        "Authorization": f"bearer {GITHUB_TOKEN}",
+        "User-Agent": "GitHub-Issues-Extractor"
+    }
+    response = get_session().post(f"{GITHUB_API_URL}/graphql", headers=headers,
+                                  json={"query": query, "variables": variables})
+    response.raise_for_status()
+    result = response.json()
+    if result.get('errors'):
+        raise requests.exceptions.RequestException(
+            "GraphQL errors: " + "; ".join(error.get('message', str(error)) for error in result['errors'])
+        )
+    return result['data']
+
+def get_issues_graphql(repo_owner, repo_name, comments_per_issue=GRAPHQL_COMMENTS_PER_ISSUE):
+    """
+    Get all open issues and their comments through the GitHub GraphQL API.
+
+    Issues come with their labels and first `comments_per_issue` comments in pages of
+    GRAPHQL_PAGE_SIZE; remaining comments are fetched per issue. Returns the issues
+    shaped like the REST listing (newest first, pull requests included) together with
+    a dict of comments by issue number, ready for format_issue_data.
+    """
+    if not GITHUB_TOKEN:
+        raise ValueError("The GraphQL engine requires a GitHub token (set GITHUB_TOKEN)")
+    
+    variables = {
+        "owner": repo_owner,
+        "name": repo_name,
+        "pageSize": GRAPHQL_PAGE_SIZE,
+        "commentsPerIssue": comments_per_issue,
+        "issuesCursor": None,
+        "pullRequestsCursor": None,
+        "withIssues": True,
+        "withPullRequests": True
+    }
+    nodes = []
+    page = 1
+    
+    try:
+        while variables["withIssues"] or variables["withPullRequests"]:
+            print(f"Requesting GraphQL issues (page {page})", file=sys.stderr)
+            repository = run_graphql_query(GRAPHQL_ISSUES_QUERY, variables)['repository']
+            
+            # Page through issues and pull requests independently until both are exhausted
+            for connection, cursor, flag in (("issues", "issuesCursor", "withIssues"),
+                                             ("pullRequests", "pullRequestsCursor", "withPullRequests")):
+                if not variables[flag]:
+                    continue
+                nodes.extend(repository[connection]['nodes'])
+                page_info = repository[connection]['pageInfo']
+                variables[cursor] = page_info['endCursor']
+                variables[flag] = page_info['hasNextPage']
+            page += 1
         
-        # Format comments
-        formatted_comments = []
-        # Add the issue body as the first comment (index 0)
+        issues = []
+        comments_by_number = {}
+        # The REST listing orders issues and pull requests together by creation date
+        for node in sorted(nodes, key=lambda node: (node['createdAt'], node['number']), reverse=True):
+            comments = [{"body": comment['body']} for comment in node['comments']['nodes']]
+            page_info = node['comments']['pageInfo']
+            while page_info['hasNextPage']:
+                data = run_graphql_query(GRAPHQL_COMMENTS_QUERY, {
+                    "owner": repo_owner, "name": repo_name, "number": node['number'], "cursor": page_info['endCursor']
+                })
+                connection = data['repository']['issueOrPullRequest']['comments']
+                comments.extend({"body": comment['body']} for comment in connection['nodes'])
+                page_info = connection['pageInfo']
+            
+            issues.append({
+                "number": node['number'],
+                "title": node['title'],
+                "body": node['body'],
+                "html_url": node['url'],
+                "labels": node['labels']['nodes'],
+                "comments": len(comments)
+            })
+            comments_by_number[node['number']] = comments
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching issues through GraphQL: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    return issues, comments_by_number
+
+def map_ordered(func, items, concurrency=1):
+    """
+    Yield `(item, func(item))` pairs in the order of `items`, running up to
+    `concurrency` calls in parallel.
+
+    Unlike executor.map, at most a small window of items is in flight at a time, so
+    `items` can be a generator and results are produced as soon as they are ready.
+    """
+    concurrency = max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= concurrency * 2:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+def format_issue(issue, comments):
+    """Format a single issue and its comments into the output structure."""
+    # Extract label names
+    labels = [label['name'] for label in issue.get('labels', [])]
+    
+    # Format comments
+    formatted_comments = []
+    # Add the issue body as the first comment (index 0)
+    formatted_comments.append({
+        "index": 0,
+        "text": issue['body'] or ""
+    })
+    
+    # Add the rest of the comments
+    for j, comment in enumerate(comments):
         formatted_comments.append({
-            "index": 0,
-            "text": issue['body'] or ""
+            "index": j + 1,  # Start from 1 since the issue body is index 0
+            "text": comment['body']
         })
-        
-        # Add the rest of the comments
-        for j, comment in enumerate(comments):
-            formatted_comments.append({
-                "index": j + 1,  # Start from 1 since the issue body is index 0
-                "text": comment['body']
-            })
-        
-        # Create the formatted issue
-        formatted_issue = {
-            "title": issue['title'],
-            "number": issue['number'],
-            "url": issue['html_url'],
-            "labels": labels,
-            "comments": formatted_comments
-        }
-        
-        formatted_issues.append(formatted_issue)
+    
+    # Create the formatted issue
+    return {
+        "title": issue['title'],
+        "number": issue['number'],
+        "url": issue['html_url'],
+        "labels": labels,
+        "comments": formatted_comments
+    }
+
+def format_issue_data(issues, repo_owner, repo_name, concurrency=1, comments_by_number=None):
+    """
+    Format issues and their comments into the desired structure.
+
+    Comments are fetched with up to `concurrency` requests in flight; the output
+    keeps the order of `issues` regardless of the order in which fetches finish.
+    If `comments_by_number` (as returned by get_repo_comments) is given, comments
+    are taken from it and no per-issue requests are made.
+    """
+    return list(iter_formatted_issues(issues, repo_owner, repo_name, concurrency, comments_by_number))
+
+def iter_formatted_issues(issues, repo_owner, repo_name, concurrency=1, comments_by_number=None):
+    """
+    Yield formatted issues one by one as soon as their comments are fetched; see
+    format_issue_data. `issues` may be a generator such as iter_all_issues.
+    """
+    total = len(issues) if hasattr(issues, '__len__') else None
+    
+    def fetch_comments(issue):
+        if comments_by_number is not None:
+            return comments_by_number.get(issue['number'], [])
+        return get_issue_comments(repo_owner, repo_name, issue['number'], issue.get('comments'))
+    
+    for i, (issue, comments) in enumerate(map_ordered(fetch_comments, issues, concurrency)):
+        yield format_issue(issue, comments)
         
         # Print progress update
-        print(f"Processed issue {i+1}/{len(issues)}: #{issue['number']}", file=sys.stderr)
-    
-    return formatted_issues
+        progress = f"{i+1}/{total}" if total is not None else f"{i+1}"
+        print(f"Processed issue {progress}: #{issue['number']}", file=sys.stderr)
 
-def get_llm_recommendation(issues_data, repo_owner, repo_name):
+def sync_issue_cache(cache, repo_owner, repo_name, concurrency=1, engine='rest'):
     """
-    Send the issues data to the OpenAI API and return the recommendation.
+    Bring the on-disk issue cache for a repository up to date.
+
+    The first sync downloads all open issues. Later syncs only request issues updated
+    since the previous one (including closed ones, which are dropped from the cache),
+    and only fetch comments for issues that changed.
     """
-    if not OPENAI_API_KEY:
-        print("Warning: OPENAI_API_KEY not found in environment variables.", file=sys.stderr)
-        print("To get recommendations, set the OPENAI_API_KEY or pass the generated issues.json file to your preferred LLM with this prompt:", file=sys.stderr)
-        print("\nGiven the following list of GitHub issues and their full discussions, what is the best first issue")
-        print("for someone who wants to contribute to this repository? Please consider clarity, complexity, and")
-        print("whether the issue seems well-scoped for a newcomer. Return your recommendation along with a short explanation.\n")
-        return None
+    repo = f"{repo_owner}/{repo_name}"
+    since = cache.get_since(repo)
     
-    try:
-        # Prepare a simplified version of the issues data to avoid token limits
-        simplified_issues = []
-        for issue in issues_data:
-            simplified_issue = {
-                "title": issue['title'],
-                "number": issue['number'],
-                "url": issue['url'],
-                "labels": issue['labels'],
-                "comments": [
-                    {
-                        "index": comment['index'],
-                        "text": comment['text'][:500] + ("..." if len(comment['text']) > 500 else "")
-                    }
-                    for comment in issue['comments']
-                ]
+    if since:
+        print(f"Fetching issues updated since {since}...", file=sys.stderr)
+        issues = get_all_issues(repo_owner, repo_name, state="all", since=since)
+    else:
+        issues = get_all_issues(repo_owner, repo_name)
+    
+    invalidated = cache.upsert_issues(repo, issues)
+    print(f"{len(issues)} issues fetched, {invalidated} new or changed.", file=sys.stderr)
+    
+    # Includes issues left without comments by an interrupted previous sync
+    stale_issues = cache.get_stale_issues(repo)
+    if stale_issues:
+        print(f"Fetching comments for {len(stale_issues)} issues...", file=sys.stderr)
+        if engine == 'repo-comments' and not since:
+            all_comments = get_repo_comments(repo_owner, repo_name)
+            comments_by_number = {issue['number']: all_comments.get(issue['number'], []) for issue in stale_issues}
+        else:
+            def fetch_comments(issue):
+                return get_issue_comments(repo_owner, repo_name, issue['number'], issue.get('comments'))
+            
+            comments_by_number = {
+                issue['number']: comments for issue, comments in map_ordered(fetch_comments, stale_issues, concurrency)
             }
-            simplified_issues.append(simplified_issue)
+        cache.set_comments(repo, comments_by_number)
+    
+    # Only advance the watermark once everything it covers has been stored
+    if issues:
+        cache.set_since(repo, max([since or ""] + [issue['updated_at'] for issue in issues]))
+
+def print_rate_limit_stats():
+    """Print request counters and the remaining GitHub rate limit budget."""
+    stats = get_session().rate_limiter.stats()
+    print(f"GitHub requests: {stats['requests']} ({stats['cache_hits']} not modified), "
+          f"retries: {stats['retries']}, waited: {stats['waited_seconds']:.1f}s", file=sys.stderr)
+    for resource, bucket in stats['buckets'].items():
+        print(f"Rate limit '{resource}': {bucket['remaining']}/{bucket['limit']} remaining", file=sys.stderr)
+
+def print_llm_setup_help():
+    """Explain how to get a recommendation without an OpenAI API key."""
+    print("Warning: OPENAI_API_KEY not found in environment variables.", file=sys.stderr)
+    print("To get recommendations, set the OPENAI_API_KEY or pass the generated issues.json file to your preferred LLM with this prompt:", file=sys.stderr)
+    print("\nGiven the following list of GitHub issues and their full discussions, what is the best first issue")
+    print("for someone who wants to contribute to this repository? Please consider clarity, complexity, and")
+    print("whether the issue seems well-scoped for a newcomer. Return your recommendation along with a short explanation.\n")
+
+def build_openai_request(prompt, max_tokens=5000, json_response=False, stream=False):
+    """Build the body of a chat completion request for `prompt`."""
+    data = {
+        "model": LLM_MODEL,
+        "messages": [
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": LLM_TEMPERATURE,
+        "max_tokens": max_tokens
+    }
+    if json_response:
+        data["response_format"] = {"type": "json_object"}
+    if stream:
+        data["stream"] = True
+    return data
+
+def post_openai(data, retries=DEFAULT_LLM_RETRIES, stream=False):
+    """
+    Send a chat completion request to the OpenAI API and return the response.
+
+    Rate limited responses (honoring Retry-After), server errors and connection
+    failures are retried up to `retries` times with jittered backoff.
+    """
+    url = f"{OPENAI_API_URL}/chat/completions"
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {OPENAI_API_KEY}"
+    }
+    
+    attempt = 0
+    while True:
+        try:
+            response = openai_session.post(url, headers=headers, json=data, stream=stream)
+            if response.status_code in (429, 500, 502, 503, 504) and attempt < retries:
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.replace(".", "", 1).isdigit() else backoff_delay(attempt)
+                response.close()
+            else:
+                response.raise_for_status()
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
         
-        # Create the prompt for the LLM
-        prompt = f"""Given the following list of GitHub issues and their full discussions from the repository {repo_owner}/{repo_name}, 
+        attempt += 1
+        print(f"Retrying OpenAI request in {delay:.1f}s (attempt {attempt}/{retries})", file=sys.stderr)
+        time.sleep(delay)
+
+def call_openai(prompt, max_tokens=5000, retries=DEFAULT_LLM_RETRIES, json_response=False, cache=None):
+    """
+    Send a chat completion request to the OpenAI API and return the reply text.
+
+    Failed requests are retried as in post_openai. With an LLMCache, a request identical to an earlier one is answered from the cache.
+    """
+    data = build_openai_request(prompt, max_tokens, json_response)
+    if cache:
+        key = content_key(data)
+        reply = cache.get("reply", key)
+        if reply is not None:
+            return reply
+    
+    response = post_openai(data, retries)
+    reply = response.json()['choices'][0]['message']['content']
+    if cache:
+        cache.put("reply", key, reply)
+    return reply
+
+def stream_openai(prompt, max_tokens=5000, retries=DEFAULT_LLM_RETRIES, cache=None):
+    """
+    Stream the reply to a chat completion request, yielding text chunks as the model
+    produces them.
+
+    Failed requests are retried as in post_openai until the stream starts. The cache
+    is shared with call_openai: a cached reply is yielded in one piece, and a completed
+    stream is stored.
+    """
+    data = build_openai_request(prompt, max_tokens)
+    # The streaming flag doesn't change the reply, so it is not part of the key
+    key = content_key(data)
+    if cache:
+        reply = cache.get("reply", key)
+        if reply is not None:
+            yield reply
+            return
+    
+    chunks = []
+    with post_openai(dict(data, stream=True), retries, stream=True) as response:
+        # Server-sent events: "data: {...}" lines, ending with "data: [DONE]"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get('choices') or [{}]
+            chunk = choices[0].get('delta', {}).get('content')
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+    
+    if cache:
+        cache.put("reply", key, "".join(chunks))
+
+def build_recommendation_prompt(issues_data, repo_owner, repo_name, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Build the recommendation prompt, packing issues most promising first until
+    `token_budget` prompt tokens are used.
+
+    Returns the prompt and the pack_issues report of `(issue number, tokens)`.
+    """
+    packed_issues, report = pack_issues(issues_data, token_budget)
+    prompt = f"""Given the following list of GitHub issues and their full discussions from the repository {repo_owner}/{repo_name}, 
 what is the best first issue for someone who wants to contribute to this repository? 
 Please consider clarity, complexity, and whether the issue seems well-scoped for a newcomer.
 Return your recommendation along with a short explanation.
 
+{packed_issues_format_note(repo_owner, repo_name)}
+
 Issues:
-{json.dumps(simplified_issues, indent=2)}
+{packed_issues}
 """
+    return prompt, report
+
+def get_llm_recommendation(issues_data, repo_owner, repo_name, token_budget=DEFAULT_TOKEN_BUDGET,
+                           retries=DEFAULT_LLM_RETRIES, cache=None, stream=False):
+    """
+    Send the issues data to the OpenAI API and return the recommendation.
+
+    Issues are packed into the prompt most promising first, until `token_budget`
+    prompt tokens are used. With an LLMCache, an unchanged prompt reuses the
+    earlier recommendation. With `stream`, the recommendation is printed as it is
+    generated.
+    """
+    if not OPENAI_API_KEY:
+        print_llm_setup_help()
+        return None
+    
+    try:
+        # Pack as many issues as the budget allows, in a compact encoding
+        prompt, report = build_recommendation_prompt(issues_data, repo_owner, repo_name, token_budget)
+        print(f"Packed {len(report)}/{len(issues_data)} issues into {sum(tokens for _, tokens in report)} "
+              f"of {token_budget} prompt tokens:", file=sys.stderr)
+        for number, tokens in report:
+            print(f"  #{number}: {tokens} tokens", file=sys.stderr)
+        if len(report) < len(issues_data):
+            print("Not all issues fit; use --llm-mode map-reduce to rank every issue.", file=sys.stderr)
         
-        # Call the OpenAI API
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {OPENAI_API_KEY}"
-        }
-        data = {
-            "model": "gpt-4.1-mini",
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant that analyzes GitHub issues to find the best first issues for newcomers."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.5,
-            "max_tokens": 5000
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        result = response.json()
-        recommendation = result['choices'][0]['message']['content']
+        if not stream:
+            recommendation = call_openai(prompt, retries=retries, cache=cache)
+            print("\nLLM Recommendation:")
+            print("===================")
+            print(recommendation)
+            return recommendation
         
+        chunks = stream_openai(prompt, retries=retries, cache=cache)
+        # Wait for the first chunk, so a failed request doesn't leave a dangling header
+        first_chunk = next(chunks, "")
         print("\nLLM Recommendation:")
         print("===================")
-        print(recommendation)
-        
-        return recommendation
+        recommendation = [first_chunk]
+        print(first_chunk, end="", flush=True)
+        for chunk in chunks:
+            recommendation.append(chunk)
+            print(chunk, end="", flush=True)
+        print()
+        return "".join(recommendation)
         
     except requests.exceptions.RequestException as e:
         print(f"Error calling OpenAI API: {e}", file=sys.stderr)
@@ -235,41 +701,292 @@ Issues:
         print(f"Error processing LLM recommendation: {e}", file=sys.stderr)
         return None
 
+def packed_issues_format_note(repo_owner, repo_name):
+    """Explain the packed issue encoding to the LLM."""
+    return f"""Each issue starts with its number, title and [labels], followed by its discussion, one entry per line;
+entry 0 is the issue description. Issue #N is at https://github.com/{repo_owner}/{repo_name}/issues/N."""
+
+def rank_shard(shard_text, shard_numbers, repo_owner, repo_name, top_k, retries=DEFAULT_LLM_RETRIES):
+    """
+    Ask the LLM for the `top_k` best first issues of one shard.
+
+    Returns a list of `{"number", "score", "reason"}` dicts. Replies that are not valid
+    JSON or name issues outside the shard are retried like failed requests.
+    """
+    prompt = f"""Below is one batch of open GitHub issues from the repository {repo_owner}/{repo_name}.
+Pick the {top_k} issues in this batch that are the best first issues for someone who wants to contribute
+to this repository. Consider clarity, complexity, and whether the issue seems well-scoped for a newcomer.
+
+Answer with a JSON object of the form {{"issues": [{{"number": 123, "score": 8, "reason": "..."}}]}},
+best first, scoring each issue from 0 (unsuitable) to 10 (ideal).
+
+{packed_issues_format_note(repo_owner, repo_name)}
+
+Issues:
+{shard_text}
+"""
+    for attempt in range(retries + 1):
+        reply = call_openai(prompt, max_tokens=200 + 100 * top_k, retries=retries, json_response=True)
+        try:
+            picks = [
+                {"number": int(pick['number']), "score": float(pick.get('score', 0)), "reason": pick.get('reason', "")}
+                for pick in json.loads(reply)['issues']
+            ]
+            if all(pick['number'] in shard_numbers for pick in picks):
+                return picks[:top_k]
+        except (ValueError, KeyError, TypeError):
+            pass
+        print(f"Unusable shard ranking (attempt {attempt + 1}/{retries + 1})", file=sys.stderr)
+    raise ValueError("LLM did not return a usable ranking for a shard")
+
+def issue_score_key(issue, top_k):
+    """Cache key for the shard ranking result of one issue, derived from its content."""
+    return content_key(LLM_MODEL, LLM_TEMPERATURE, top_k, encode_issue(issue))
+
+def get_llm_recommendation_map_reduce(issues_data, repo_owner, repo_name, token_budget=DEFAULT_TOKEN_BUDGET,
+                                      shard_token_budget=DEFAULT_SHARD_TOKEN_BUDGET, top_k=DEFAULT_TOP_K,
+                                      concurrency=DEFAULT_LLM_CONCURRENCY, retries=DEFAULT_LLM_RETRIES, cache=None,
+                                      stream=False):
+    """
+    Rank issues that do not fit in a single prompt and return the recommendation.
+
+    The issues are split into shards of at most `shard_token_budget` tokens, and the LLM
+    picks the `top_k` best issues of each shard, with up to `concurrency` shard calls in
+    flight. A final get_llm_recommendation call over the finalists makes the
+    recommendation, so the latency is about that of two sequential calls.
+
+    With an LLMCache, the ranking result of every issue (its score if it was picked,
+    None otherwise) is cached by the issue's content, and only new or changed issues
+    are sent to the LLM again. `stream` applies to the final recommendation.
+    """
+    if not OPENAI_API_KEY:
+        print_llm_setup_help()
+        return None
+    
+    # Best score per finalist
+    finalists = {}
+    to_rank = issues_data
+    if cache:
+        score_keys = {issue['number']: issue_score_key(issue, top_k) for issue in issues_data}
+        to_rank = []
+        for issue in issues_data:
+            cached = cache.get("score", score_keys[issue['number']])
+            if cached is None:
+                to_rank.append(issue)
+            elif cached['score'] is not None:
+                finalists[issue['number']] = cached['score']
+        print(f"Reusing cached rankings of {len(issues_data) - len(to_rank)} unchanged issues.", file=sys.stderr)
+    
+    shards = shard_issues(to_rank, shard_token_budget)
+    print(f"Ranking {len(to_rank)} issues in {len(shards)} shards...", file=sys.stderr)
+    
+    def rank(shard):
+        shard_text, shard_numbers = shard
+        return rank_shard(shard_text, set(shard_numbers), repo_owner, repo_name, top_k, retries)
+    
+    # A failed shard is reported but doesn't sink the ranking
+    results = map_ordered(lambda shard: _capture_errors(rank, shard), shards, concurrency)
+    for i, ((_, shard_numbers), result) in enumerate(results):
+        if isinstance(result, Exception):
+            print(f"Error ranking shard {i + 1}/{len(shards)}: {result}", file=sys.stderr)
+            continue
+        for pick in result:
+            finalists[pick['number']] = max(pick['score'], finalists.get(pick['number'], pick['score']))
+        if cache:
+            for number in shard_numbers:
+                cache.put("score", score_keys[number], {"score": finalists.get(number)})
+        picked = ", ".join(f"#{pick['number']}" for pick in result)
+        print(f"Ranked shard {i + 1}/{len(shards)}: {picked}", file=sys.stderr)
+    
+    if not finalists:
+        print("Error processing LLM recommendation: no shard could be ranked", file=sys.stderr)
+        return None
+    
+    issues_by_number = {issue['number']: issue for issue in issues_data}
+    finalist_issues = [issues_by_number[number] for number in sorted(finalists, key=finalists.get, reverse=True)]
+    print(f"Selecting the recommendation from {len(finalist_issues)} finalists...", file=sys.stderr)
+    return get_llm_recommendation(finalist_issues, repo_owner, repo_name, token_budget=token_budget, retries=retries,
+                                  cache=cache, stream=stream)
+
+def _capture_errors(func, *args):
+    """Call `func`, returning the exception instead of raising it."""
+    try:
+        return func(*args)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return e
+
 def main():
     parser = argparse.ArgumentParser(description='Extract issues from a GitHub repository and get LLM recommendations.')
     parser.add_argument('repo_url', nargs='?', default='https://github.com/saharmor/cursor-view', 
                         help='GitHub repository URL, e.g., https://github.com/owner/repo (default: https://github.com/saharmor/cursor-view)')
     parser.add_argument('--output', '-o', default='issues.json', help='Output JSON file path (default: issues.json)')
+    parser.add_argument('--format', '-f', choices=['json', 'jsonl'], default='json',
+                        help='Output format: an indented JSON array, or JSON Lines with one issue per line (default: json)')
     parser.add_argument('--no-llm', action='store_true', help='Skip LLM recommendation')
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f'Prompt tokens to spend on issues in the LLM recommendation (default: {DEFAULT_TOKEN_BUDGET})')
+    parser.add_argument('--shortlist', type=int, default=DEFAULT_SHORTLIST,
+                        help='Only send the issues with the best local heuristic scores to the LLM, 0 to send all '
+                             f'(default: {DEFAULT_SHORTLIST})')
+    parser.add_argument('--llm-mode', choices=['single', 'map-reduce'], default='single',
+                        help='"single" sends the issues that fit in --token-budget in one prompt, "map-reduce" ranks '
+                             'shards of all issues in parallel and picks the recommendation from their finalists '
+                             '(default: single)')
+    parser.add_argument('--shard-tokens', type=int, default=DEFAULT_SHARD_TOKEN_BUDGET,
+                        help=f'Prompt tokens per shard with --llm-mode map-reduce (default: {DEFAULT_SHARD_TOKEN_BUDGET})')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help=f'Finalists kept per shard with --llm-mode map-reduce (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--llm-concurrency', type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help=f'Shards ranked in parallel with --llm-mode map-reduce (default: {DEFAULT_LLM_CONCURRENCY})')
+    parser.add_argument('--llm-retries', type=int, default=DEFAULT_LLM_RETRIES,
+                        help=f'Retries per OpenAI request on rate limits and transient errors (default: {DEFAULT_LLM_RETRIES})')
+    parser.add_argument('--no-stream', action='store_true',
+                        help='Print the LLM recommendation once it is complete instead of as it is generated')
+    parser.add_argument('--llm-cache', metavar='DIR', default=os.environ.get("LLM_CACHE_DIR"),
+                        help='Directory to cache LLM results in, so unchanged issues and prompts cost no tokens on '
+                             'later runs (can also be set with LLM_CACHE_DIR)')
     parser.add_argument('--no-token', action='store_true', help='Skip using GitHub token (useful for public repositories)')
+    parser.add_argument('--concurrency', '-c', type=int, default=1,
+                        help='Number of issues to fetch comments for in parallel (default: 1)')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='SQLite file to cache issues and comments in; later runs only fetch what changed')
+    parser.add_argument('--http-cache', metavar='DIR',
+                        help='Directory to keep GitHub responses in, so later runs send conditional requests '
+                             '(can also be set with GITHUB_HTTP_CACHE_DIR)')
+    parser.add_argument('--label', action='append', dest='labels', metavar='LABEL',
+                        help='Only include issues with this label (repeat for several labels, all must match)')
+    parser.add_argument('--assignee', help='Only include issues assigned to this user ("none" for unassigned, "*" for any)')
+    parser.add_argument('--created-after', metavar='DATE', help='Only include issues created at or after this ISO 8601 date')
+    parser.add_argument('--created-before', metavar='DATE', help='Only include issues created before this ISO 8601 date')
+    parser.add_argument('--updated-after', metavar='DATE', help='Only include issues updated at or after this ISO 8601 date')
+    parser.add_argument('--updated-before', metavar='DATE', help='Only include issues updated before this ISO 8601 date')
+    parser.add_argument('--exclude-prs', action='store_true', help='Leave out pull requests')
+    parser.add_argument('--exclude-linked-prs', action='store_true',
+                        help='Leave out issues that already have a linked pull request (uses the search API)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from its checkpoint, appending to the output '
+                             '(requires --format jsonl and the rest or repo-comments engine)')
+    parser.add_argument('--engine', choices=['rest', 'repo-comments', 'graphql'], default='rest',
+                        help='How to fetch comments: "rest" requests them per issue, "repo-comments" pages through '
+                             'the repository-wide comment listing once, "graphql" fetches issues together with '
+                             'their comments through the GraphQL API (requires a token) (default: rest)')
     args = parser.parse_args()
     
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.shortlist < 0:
+        parser.error("--shortlist must be at least 0")
+    if args.llm_concurrency < 1 or args.top_k < 1 or args.shard_tokens < 1 or args.llm_retries < 0:
+        parser.error("--llm-concurrency, --top-k and --shard-tokens must be at least 1, --llm-retries at least 0")
+    if args.engine == 'graphql' and args.cache:
+        parser.error("--engine graphql cannot be combined with --cache")
+    try:
+        issue_filter = IssueFilter(labels=args.labels, assignee=args.assignee,
+                                   created_after=args.created_after, created_before=args.created_before,
+                                   updated_after=args.updated_after, updated_before=args.updated_before,
+                                   exclude_pull_requests=args.exclude_prs, exclude_linked_prs=args.exclude_linked_prs)
+    except ValueError as e:
+        parser.error(f"Invalid date: {e}")
+    if args.engine == 'graphql' and issue_filter.is_active():
+        parser.error("Issue filters are not supported with --engine graphql")
+    if args.cache and args.exclude_linked_prs:
+        parser.error("--exclude-linked-prs cannot be combined with --cache")
+    if args.resume and (args.format != 'jsonl' or args.engine == 'graphql' or args.cache):
+        parser.error("--resume requires --format jsonl and cannot be combined with --engine graphql or --cache")
+    
     # Override token if --no-token is set
     global GITHUB_TOKEN
     if args.no_token:
         print("Skipping GitHub token as requested.", file=sys.stderr)
         GITHUB_TOKEN = None
     
+    if args.http_cache:
+        set_cache_dir(args.http_cache)
+    # One pooled connection per concurrent comment fetch
+    ensure_pool_size(args.concurrency)
+    
     try:
         repo_owner, repo_name = parse_github_url(args.repo_url)
         print(f"Extracting issues from {repo_owner}/{repo_name}...", file=sys.stderr)
         
-        # Get all issues
-        issues = get_all_issues(repo_owner, repo_name)
-        print(f"Found {len(issues)} open issues.", file=sys.stderr)
+        comments_by_number = None
+        checkpoint = None
+        if args.cache:
+            # Sync the cache and rebuild the output from it
+            cache = IssueCache(args.cache)
+            try:
+                sync_issue_cache(cache, repo_owner, repo_name, concurrency=args.concurrency, engine=args.engine)
+                issues, comments_by_number = cache.get_issues(f"{repo_owner}/{repo_name}")
+            finally:
+                cache.close()
+            # The cache holds all open issues; filter them locally
+            issues = [issue for issue in issues if issue_filter.matches(issue)]
+            print(f"Found {len(issues)} open issues.", file=sys.stderr)
+        elif args.engine == 'graphql':
+            # Issues and comments come back together
+            issues, comments_by_number = get_issues_graphql(repo_owner, repo_name)
+            print(f"Found {len(issues)} open issues.", file=sys.stderr)
+        else:
+            # Fetch all comments up front when using the repository-wide listing
+            if args.engine == 'repo-comments':
+                comments_by_number = get_repo_comments(repo_owner, repo_name)
+            
+            # Stream issues page by page instead of collecting them first. With JSON
+            # Lines output, completed pages and issues are checkpointed for --resume.
+            if args.format == 'jsonl':
+                checkpoint = Checkpoint(f"{args.output}.checkpoint", f"{repo_owner}/{repo_name}", resume=args.resume)
+                if args.resume:
+                    # Issues already in the output count as done even if the checkpoint missed them
+                    checkpoint.done.update(issue['number'] for issue in read_jsonl(args.output))
+                    print(f"Resuming after page {checkpoint.last_page} with {len(checkpoint.done)} issues done.",
+                          file=sys.stderr)
+                issues = chain(
+                    checkpoint.pending_issues(),
+                    iter_all_issues(repo_owner, repo_name, start_page=checkpoint.last_page + 1,
+                                    on_page=checkpoint.record_page, issue_filter=issue_filter)
+                )
+                # Pages can shift while paging, so drop issues that were already written
+                issues = (issue for issue in issues if issue['number'] not in checkpoint.done)
+            else:
+                issues = iter_all_issues(repo_owner, repo_name, issue_filter=issue_filter)
         
-        # Format the issues data
-        formatted_issues = format_issue_data(issues, repo_owner, repo_name)
+        # Write each issue as soon as it is formatted; only keep them around for the LLM
+        formatted_issues = [] if not args.no_llm else None
+        if formatted_issues is not None and args.resume:
+            formatted_issues.extend(read_jsonl(args.output))
+        with open_writer(args.output, args.format, append=args.resume) as writer:
+            for formatted_issue in iter_formatted_issues(issues, repo_owner, repo_name, args.concurrency,
+                                                         comments_by_number):
+                writer.write(formatted_issue)
+                if checkpoint:
+                    checkpoint.record_done(formatted_issue['number'])
+                if formatted_issues is not None:
+                    formatted_issues.append(formatted_issue)
         
-        # Write to JSON file
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(formatted_issues, f, indent=2, ensure_ascii=False)
+        if checkpoint:
+            checkpoint.close(completed=True)
         
-        print(f"\nIssues data saved to {args.output}", file=sys.stderr)
+        print(f"\n{writer.count} issues saved to {args.output}", file=sys.stderr)
+        print_rate_limit_stats()
         
         # Get LLM recommendation if not disabled
         if not args.no_llm:
-            get_llm_recommendation(formatted_issues, repo_owner, repo_name)
+            if args.shortlist and len(formatted_issues) > args.shortlist:
+                print(f"Shortlisted {args.shortlist} of {len(formatted_issues)} issues for the LLM.", file=sys.stderr)
+                formatted_issues = shortlist_issues(formatted_issues, args.shortlist)
+            
+            llm_cache = LLMCache(args.llm_cache) if args.llm_cache else None
+            if args.llm_mode == 'map-reduce':
+                get_llm_recommendation_map_reduce(formatted_issues, repo_owner, repo_name,
+                                                  token_budget=args.token_budget, shard_token_budget=args.shard_tokens,
+                                                  top_k=args.top_k, concurrency=args.llm_concurrency,
+                                                  retries=args.llm_retries, cache=llm_cache,
+                                                  stream=not args.no_stream)
+            else:
+                get_llm_recommendation(formatted_issues, repo_owner, repo_name, token_budget=args.token_budget,
+                                       retries=args.llm_retries, cache=llm_cache, stream=not args.no_stream)
+            if llm_cache:
+                print(f"LLM cache: {llm_cache.hits} hits, {llm_cache.misses} misses", file=sys.stderr)
         
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -0,0 +1,155 @@
+"""
+Local HTTP server that replays recorded GitHub API responses, so the extractor can be
+run offline. Point the extractor at it with the GITHUB_API_URL environment variable:
+
+    python fixture_server.py fixtures.json --record https://api.github.com
+    GITHUB_API_URL=http://localhost:8765 python extract_issues.py https://github.com/owner/repo --no-llm
+    python fixture_server.py fixtures.json
+    GITHUB_API_URL=http://localhost:8765 python extract_issues.py https://github.com/owner/repo --no-llm
+
+The fixture file is a JSON list of recorded exchanges:
+
+    [{"path": "/repos/owner/repo/issues", "query": {"page": "1", ...}, "status": 200, "body": [...]},
+     {"method": "POST", "path": "/graphql", "json": {"variables": {...}}, "status": 200, "body": {"data": ...}}]
+
+A GET matches an exchange when its path and query parameters are exactly equal. A POST
+matches on path and JSON body; GraphQL requests (bodies with a "query") match on their
+variables only, so fixtures survive edits to the query text.
+Exchanges recorded with an ETag answer matching If-None-Match requests with 304.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+
+# Response headers worth keeping when recording
+RECORDED_HEADERS = ("ETag", "Last-Modified", "Link", "X-RateLimit-Limit", "X-RateLimit-Remaining",
+                    "X-RateLimit-Reset", "Retry-After")
+
+def request_key(path, query, body=None):
+    """Build the lookup key for a request path, its query parameters and JSON body."""
+    if body is None:
+        return path, tuple(sorted(query.items()))
+    if isinstance(body, dict) and 'query' in body:
+        body = body.get('variables') or {}
+    return path, tuple(sorted(query.items())), json.dumps(body, sort_keys=True)
+
+def load_fixtures(path):
+    """Load recorded exchanges from a fixture file, keyed by request."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        exchanges = json.load(f)
+    return {request_key(e['path'], e.get('query', {}), e.get('json')): e for e in exchanges}
+
+def save_fixtures(path, fixtures):
+    """Write recorded exchanges back to a fixture file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(list(fixtures.values()), f, indent=2, ensure_ascii=False)
+
+def make_handler(fixtures, fixture_path, upstream=None):
+    """Create a request handler class that replays (or records) `fixtures`."""
+    record_lock = threading.Lock()
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        # Keep connections alive like the real API does
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; don't let Nagle delay the body
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.replay()
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.replay(json.loads(self.rfile.read(length) or b'null'))
+
+        def replay(self, body=None):
+            parts = urlsplit(self.path)
+            query = dict(parse_qsl(parts.query))
+            key = request_key(parts.path, query, body)
+
+            if upstream and key not in fixtures:
+                exchange = self.record(parts.path, query, body)
+                with record_lock:
+                    fixtures[key] = exchange
+                    save_fixtures(fixture_path, fixtures)
+
+            exchange = fixtures.get(key)
+            if exchange is None:
+                print(f"No fixture for {self.path}", file=sys.stderr)
+                self.send_json(404, {"message": "Not Found (no recorded fixture)"})
+                return
+
+            headers = exchange.get('headers', {})
+            if headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+                self.send_response(304)
+                self.send_header("ETag", headers['ETag'])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_json(exchange.get('status', 200), exchange.get('body'), headers)
+
+        def record(self, path, query, body=None):
+            """Forward the request upstream and capture the response."""
+            headers = {k: v for k, v in self.headers.items() if k.lower() in ('accept', 'authorization', 'user-agent')}
+            method = "GET" if body is None else "POST"
+            response = requests.request(method, f"{upstream.rstrip('/')}{path}", params=query, headers=headers,
+                                        json=body)
+            print(f"Recorded {method} {path} {query} -> {response.status_code}", file=sys.stderr)
+
+            exchange = {"path": path, "query": query}
+            if body is not None:
+                exchange.update(method=method, json=body)
+            exchange.update(
+                status=response.status_code,
+                headers={h: response.headers[h] for h in RECORDED_HEADERS if h in response.headers},
+                body=response.json() if response.content else None
+            )
+            return exchange
+
+        def send_json(self, status_code, body, headers=None):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} - {format % args}", file=sys.stderr)
+
+    return FixtureHandler
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded GitHub API responses from a local HTTP server.')
+    parser.add_argument('fixtures', help='Path to the JSON fixture file')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--record', metavar='UPSTREAM_URL',
+                        help='Forward unknown requests to this API (e.g. https://api.github.com) and save the responses')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fixtures, args.fixtures, args.record))
+    mode = f"recording from {args.record}" if args.record else "replaying"
+    print(f"Serving {len(fixtures)} fixtures on http://{args.host}:{args.port} ({mode})", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
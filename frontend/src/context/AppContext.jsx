@@ -1,4 +1,4 @@
-import { createContext, useContext, useState, useEffect } from 'react';
+import { createContext, useContext, useState, useEffect, useCallback } from 'react';
 import { api } from '../utils/api';
 
 const AppContext = createContext();
@@ -99,6 +99,22 @@ export const AppProvider = ({ children }) => {
     }
   };
   
+  // Follow scan status updates pushed by the server; returns a function that stops them
+  const watchScan = useCallback((id, onUpdate) => 
+    api.watchScan(id, (data) => {
+      setScanStatus(data.status);
+      
+      // Running scans report the best issues found so far
+      if (data.issues) {
+        setIssues(data.issues);
+      }
+      if (data.status === 'failed') {
+        setError(data.error || 'Repository scan failed');
+      }
+      
+      onUpdate(data);
+    }, () => setError('Failed to check scan status')), []);
+  
   // Start issue implementation
   const implementIssue = async (issue) => {
     try {
@@ -141,6 +157,21 @@ export const AppProvider = ({ children }) => {
     }
   };
   
+  // Follow implementation status updates pushed by the server; returns a function that stops them
+  const watchImplementation = useCallback((id, onUpdate) => 
+    api.watchImplementation(id, (data) => {
+      setImplementationStatus(data.status);
+      
+      if (data.status === 'completed' && data.pull_request) {
+        setPullRequest(data.pull_request);
+      }
+      if (data.status === 'failed' || data.status === 'cancelled') {
+        setError(data.error || 'Issue implementation failed');
+      }
+      
+      onUpdate(data);
+    }, () => setError('Failed to check implementation status')), []);
+  
   // Logout
   const logout = async () => {
     try {
@@ -176,8 +207,10 @@ export const AppProvider = ({ children }) => {
     setSelectedRepo,
     scanRepository,
     checkScanStatus,
+    watchScan,
     implementIssue,
     checkImplementationStatus,
+    watchImplementation,
     logout
   };
   
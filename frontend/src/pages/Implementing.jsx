@@ -9,7 +9,7 @@ export default function Implementing() {
   const navigate = useNavigate();
   const { 
     selectedIssue,
-    checkImplementationStatus, 
+    watchImplementation, 
     implementationStatus, 
     pullRequest,
     error 
@@ -30,44 +30,30 @@ export default function Implementing() {
       return;
     }
     
-    const interval = setInterval(async () => {
-      const result = await checkImplementationStatus(implementationId);
+    let navigateTimeout;
+    
+    // The server pushes a status event whenever the implementation advances
+    const stopWatching = watchImplementation(implementationId, (result) => {
+      const completed = result.status === 'completed';
+      const newProgress = completed ? 100 : Math.min(result.progress?.percent ?? 0, 99);
+      setProgress(newProgress);
       
-      // Update progress for UI animation
-      setProgress(prev => {
-        const newProgress = Math.min(prev + 5, 90);
-        
-        // Update implementation steps based on progress
-        if (newProgress >= 20 && !implementationSteps[0].completed) {
-          setImplementationSteps(prev => prev.map((step, i) => i === 0 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 40 && !implementationSteps[1].completed) {
-          setImplementationSteps(prev => prev.map((step, i) => i === 1 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 60 && !implementationSteps[2].completed) {
-          setImplementationSteps(prev => prev.map((step, i) => i === 2 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 80 && !implementationSteps[3].completed) {
-          setImplementationSteps(prev => prev.map((step, i) => i === 3 ? { ...step, completed: true } : step));
-        }
-        
-        return newProgress;
-      });
+      // Update implementation steps based on progress
+      setImplementationSteps(prev => prev.map((step, i) => newProgress >= (i + 1) * 20 ? { ...step, completed: true } : step));
       
-      if (result && result.status === 'completed') {
-        setProgress(100);
-        setImplementationSteps(prev => prev.map(step => ({ ...step, completed: true })));
-        clearInterval(interval);
-        
+      if (completed) {
         // Navigate to celebration page after a short delay
-        setTimeout(() => {
+        navigateTimeout = setTimeout(() => {
           navigate(`/celebration/${implementationId}`);
         }, 1500);
       }
-    }, 1000);
+    });
     
-    return () => clearInterval(interval);
-  }, [implementationId, checkImplementationStatus, navigate, implementationSteps]);
+    return () => {
+      stopWatching();
+      clearTimeout(navigateTimeout);
+    };
+  }, [implementationId, watchImplementation, navigate]);
   
   // Animation for the code typing effect
   const [codeText, setCodeText] = useState('');
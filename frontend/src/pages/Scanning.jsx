@@ -16,7 +16,7 @@ export default function Scanning() {
   const navigate = useNavigate();
   const { 
     selectedRepo, 
-    checkScanStatus, 
+    watchScan, 
     scanStatus, 
     issues, 
     error 
@@ -37,44 +37,30 @@ export default function Scanning() {
       return;
     }
     
-    const interval = setInterval(async () => {
-      const result = await checkScanStatus(scanId);
+    let navigateTimeout;
+    
+    // The server pushes a status event whenever the scan advances
+    const stopWatching = watchScan(scanId, (result) => {
+      const completed = result.status === 'completed';
+      const newProgress = completed ? 100 : Math.min(result.progress?.percent ?? 0, 99);
+      setProgress(newProgress);
       
-      // Update progress for UI animation
-      setProgress(prev => {
-        const newProgress = Math.min(prev + 5, 90);
-        
-        // Update scan steps based on progress
-        if (newProgress >= 20 && !scanSteps[1].completed) {
-          setScanSteps(prev => prev.map((step, i) => i === 1 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 40 && !scanSteps[2].completed) {
-          setScanSteps(prev => prev.map((step, i) => i === 2 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 60 && !scanSteps[3].completed) {
-          setScanSteps(prev => prev.map((step, i) => i === 3 ? { ...step, completed: true } : step));
-        }
-        if (newProgress >= 80 && !scanSteps[4].completed) {
-          setScanSteps(prev => prev.map((step, i) => i === 4 ? { ...step, completed: true } : step));
-        }
-        
-        return newProgress;
-      });
+      // Update scan steps based on progress
+      setScanSteps(prev => prev.map((step, i) => newProgress >= i * 20 ? { ...step, completed: true } : step));
       
-      if (result && result.status === 'completed') {
-        setProgress(100);
-        setScanSteps(prev => prev.map(step => ({ ...step, completed: true })));
-        clearInterval(interval);
-        
+      if (completed) {
         // Navigate to issue selection after a short delay
-        setTimeout(() => {
+        navigateTimeout = setTimeout(() => {
           navigate(`/issues/${scanId}`);
         }, 1500);
       }
-    }, 1000);
+    });
     
-    return () => clearInterval(interval);
-  }, [scanId, checkScanStatus, navigate, scanSteps]);
+    return () => {
+      stopWatching();
+      clearTimeout(navigateTimeout);
+    };
+  }, [scanId, watchScan, navigate]);
   
   return (
       <div className="max-w-4xl mx-auto">
@@ -8,6 +8,29 @@ const axiosInstance = axios.create({
   withCredentials: true // Always include credentials for all requests
 });
 
+// Follow a job's status through server-sent events until it ends.
+// Returns a function that stops listening.
+const watchStatus = (url, onUpdate, onError) => {
+  const source = new EventSource(`${API_URL}${url}`, { withCredentials: true });
+  
+  source.addEventListener('status', (event) => {
+    const data = JSON.parse(event.data);
+    onUpdate(data);
+    if (['completed', 'failed', 'cancelled', 'not_found'].includes(data.status)) {
+      source.close();
+    }
+  });
+  
+  // The browser reconnects by itself after network errors; a closed source means the server refused the stream
+  source.onerror = () => {
+    if (source.readyState === EventSource.CLOSED && onError) {
+      onError();
+    }
+  };
+  
+  return () => source.close();
+};
+
 export const api = {
   // Auth endpoints
   getGithubAuthUrl: () => `${API_URL}/auth/github`,
@@ -28,9 +51,15 @@ export const api = {
   getScanStatus: (scanId) => 
     axiosInstance.get(`/repositories/scan/${scanId}`),
   
+  watchScan: (scanId, onUpdate, onError) => 
+    watchStatus(`/repositories/scan/${scanId}/events`, onUpdate, onError),
+  
   implementIssue: (scanId, issueId) => 
     axiosInstance.post(`/repositories/implement`, { scan_id: scanId, issue_id: issueId }),
   
   getImplementationStatus: (implementationId) => 
-    axiosInstance.get(`/repositories/implement/${implementationId}`)
+    axiosInstance.get(`/repositories/implement/${implementationId}`),
+  
+  watchImplementation: (implementationId, onUpdate, onError) => 
+    watchStatus(`/repositories/implement/${implementationId}/events`, onUpdate, onError)
 };
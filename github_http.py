@@ -0,0 +1,331 @@
+"""
+Shared HTTP session for GitHub API calls.
+
+All calls go through one requests.Session, so connections are kept alive and reused
+instead of paying a TCP and TLS handshake per page. The pool sizes come from
+GITHUB_POOL_CONNECTIONS (number of hosts to keep pools for), GITHUB_POOL_MAXSIZE
+(connections kept per host) and GITHUB_POOL_BLOCK (make the per-host size a hard limit).
+
+Requests are paced from the X-RateLimit-* response headers so large scans stay within
+the budget. Rate limited responses (honoring Retry-After), server errors and connection
+failures are retried with jittered exponential backoff, up to GITHUB_MAX_RETRIES times.
+
+GET responses carrying an ETag or Last-Modified validator are remembered per URL (and
+per Authorization header, so users never see each other's data). Repeated requests are
+sent as conditional requests; on a 304 Not Modified the stored body is served instead,
+which GitHub does not count against the rate limit.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Response headers kept alongside a stored body and replayed on a 304
+STORED_HEADERS = ("Content-Type", "Link")
+
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get("GITHUB_POOL_CONNECTIONS", 10))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get("GITHUB_POOL_MAXSIZE", 32))
+DEFAULT_POOL_BLOCK = os.environ.get("GITHUB_POOL_BLOCK", "").lower() in ("1", "true", "yes")
+
+# Retries for rate limited and transient failures, and the longest rate limit wait to sit out
+DEFAULT_MAX_RETRIES = int(os.environ.get("GITHUB_MAX_RETRIES", 5))
+DEFAULT_MAX_WAIT = int(os.environ.get("GITHUB_MAX_WAIT", 3600))
+
+# Server errors worth retrying
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+class ResponseStore:
+    """
+    Validators and bodies of GET responses, kept in an in-memory LRU and optionally
+    persisted to a directory so they survive between runs.
+    """
+
+    def __init__(self, directory=None, max_entries=1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(request):
+        """Build the store key for a prepared request."""
+        parts = [request.url, request.headers.get("Authorization", ""), request.headers.get("Accept", "")]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.directory:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{key}.json"), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.json")
+            # Write to a temporary file first so concurrent readers never see a partial entry
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter for the given retry attempt (starting at 0)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def rate_limit_resource(url):
+    """Guess which GitHub rate limit bucket a request URL is counted against."""
+    path = urlsplit(url).path
+    if path.startswith("/search/"):
+        return "search"
+    if path.startswith("/graphql"):
+        return "graphql"
+    return "core"
+
+class RateLimiter:
+    """
+    Paces requests using the X-RateLimit-* headers of previous responses.
+
+    Requests go out at full speed while plenty of budget is left. Once the remaining
+    budget of a bucket drops below `low_watermark` of its limit, requests are spread
+    evenly over the time left until the reset, and when it is exhausted they wait for
+    the reset. Also counts requests, retries and time spent waiting.
+    """
+
+    def __init__(self, low_watermark=0.1):
+        self.low_watermark = low_watermark
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._next_slot = {}
+        self._stats = {"requests": 0, "cache_hits": 0, "retries": 0, "waited_seconds": 0.0}
+
+    def acquire(self, url):
+        """Block until the next request to `url` fits in the rate limit budget."""
+        resource = rate_limit_resource(url)
+        with self._lock:
+            self._stats["requests"] += 1
+            bucket = self._buckets.get(resource)
+            now = time.time()
+            delay = 0.0
+            if bucket and bucket["reset"] > now:
+                if bucket["remaining"] <= 0:
+                    delay = bucket["reset"] - now + 1
+                elif bucket["remaining"] < bucket["limit"] * self.low_watermark:
+                    # Reserve evenly spaced slots so concurrent callers share the budget
+                    interval = (bucket["reset"] - now) / bucket["remaining"]
+                    slot = max(now, self._next_slot.get(resource, now))
+                    self._next_slot[resource] = slot + interval
+                    bucket["remaining"] -= 1
+                    delay = slot - now
+            if delay > 0:
+                self._stats["waited_seconds"] += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, url, response):
+        """Record the rate limit state reported by a response."""
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers or "X-RateLimit-Reset" not in headers:
+            return
+        resource = headers.get("X-RateLimit-Resource") or rate_limit_resource(url)
+        try:
+            bucket = {
+                "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                "remaining": int(headers["X-RateLimit-Remaining"]),
+                "reset": int(headers["X-RateLimit-Reset"]),
+            }
+        except ValueError:
+            return
+        with self._lock:
+            self._buckets[resource] = bucket
+
+    def record_retry(self, delay):
+        with self._lock:
+            self._stats["retries"] += 1
+            self._stats["waited_seconds"] += delay
+
+    def record_cache_hit(self):
+        with self._lock:
+            self._stats["cache_hits"] += 1
+
+    def stats(self):
+        """Return request counters and the last known budget of each rate limit bucket."""
+        with self._lock:
+            return dict(self._stats, buckets={name: dict(bucket) for name, bucket in self._buckets.items()})
+
+class GitHubSession(requests.Session):
+    """
+    Pooled requests.Session that turns repeated GETs into conditional requests and
+    schedules requests within the GitHub rate limit.
+    """
+
+    def __init__(self, store=None, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=DEFAULT_POOL_BLOCK):
+        super().__init__()
+        self.store = store if store is not None else ResponseStore()
+        self.rate_limiter = RateLimiter()
+        self.max_retries = DEFAULT_MAX_RETRIES
+        self.max_wait = DEFAULT_MAX_WAIT
+        self.configure_pool(pool_connections, pool_maxsize, pool_block)
+
+    def configure_pool(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                       pool_block=DEFAULT_POOL_BLOCK):
+        """
+        Mount connection pools keeping up to `pool_maxsize` connections per host.
+
+        Without `pool_block`, requests beyond that limit still go out but their
+        connections are closed afterwards instead of being reused.
+        """
+        self.pool_maxsize = pool_maxsize
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        for prefix in ("https://", "http://"):
+            old_adapter = self.adapters.get(prefix)
+            self.mount(prefix, adapter)
+            if old_adapter is not None and old_adapter is not adapter:
+                old_adapter.close()
+
+    def send(self, request, **kwargs):
+        # Streamed bodies are never read here, and explicit validators are left alone
+        conditional = (request.method == "GET" and not kwargs.get("stream")
+                       and "If-None-Match" not in request.headers and "If-Modified-Since" not in request.headers)
+        if not conditional:
+            return self._send_scheduled(request, **kwargs)
+
+        key = self.store.key_for(request)
+        entry = self.store.get(key)
+        if entry:
+            if entry.get("etag"):
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._send_scheduled(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = base64.b64decode(entry["body"])
+            response.headers.update(entry.get("headers", {}))
+            response.from_cache = True
+            self.rate_limiter.record_cache_hit()
+        else:
+            response.from_cache = False
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if response.status_code == 200 and (etag or last_modified):
+                self.store.put(key, {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "headers": {h: response.headers[h] for h in STORED_HEADERS if h in response.headers},
+                    "body": base64.b64encode(response.content).decode("ascii")
+                })
+
+        return response
+
+    def _send_scheduled(self, request, **kwargs):
+        """Send a request when the rate limit allows it, retrying rate limits and transient failures."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(request.url)
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                self.rate_limiter.update(request.url, response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    return response
+                response.close()
+
+            attempt += 1
+            self.rate_limiter.record_retry(delay)
+            time.sleep(delay)
+
+    def _retry_delay(self, response, attempt):
+        """Return how long to wait before retrying `response`, or None if it should be returned as is."""
+        if attempt >= self.max_retries:
+            return None
+
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get("Retry-After")
+            reset = response.headers.get("X-RateLimit-Reset")
+            if retry_after and retry_after.isdigit():
+                delay = int(retry_after)
+            elif response.headers.get("X-RateLimit-Remaining") == "0" and reset:
+                delay = max(0, int(reset) - time.time()) + 1
+            elif response.status_code == 429:
+                delay = backoff_delay(attempt)
+            else:
+                # A plain 403 is a permission problem, not a rate limit
+                return None
+            return delay if delay <= self.max_wait else None
+
+        if response.status_code in RETRY_STATUS_CODES:
+            return backoff_delay(attempt)
+
+        return None
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Return the process-wide GitHub session, creating it on first use.
+
+    Responses are persisted under GITHUB_HTTP_CACHE_DIR if that environment variable
+    is set, and kept in memory only otherwise.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = GitHubSession(ResponseStore(os.environ.get("GITHUB_HTTP_CACHE_DIR")))
+        return _session
+
+def close_session():
+    """Close the shared session's pooled connections; the next get_session() starts a new session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def set_cache_dir(directory):
+    """Persist stored responses of the shared session under `directory`."""
+    get_session().store = ResponseStore(directory)
+
+def ensure_pool_size(pool_maxsize):
+    """Grow the shared session's per-host pool to at least `pool_maxsize` connections."""
+    session = get_session()
+    if pool_maxsize > session.pool_maxsize:
+        session.configure_pool(pool_maxsize=pool_maxsize)
@@ -0,0 +1,110 @@
+import json
+import sqlite3
+
+class IssueCache:
+    """
+    On-disk SQLite cache of raw GitHub issues and their comments, keyed by repository
+    and issue number.
+
+    Each issue row stores the issue as returned by the REST API and, once fetched, its
+    comments. Comments are cleared whenever an issue's `updated_at` changes (posting a
+    comment bumps it), so only changed issues need their comments fetched again. The
+    latest `updated_at` seen per repository is kept as the `since` watermark for the
+    next sync.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL,
+                comments TEXT,
+                PRIMARY KEY (repo, number)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                repo TEXT PRIMARY KEY,
+                since TEXT NOT NULL
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def get_since(self, repo):
+        """Return the `since` watermark for the next sync, or None if never synced."""
+        row = self.conn.execute("SELECT since FROM sync_state WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else None
+
+    def set_since(self, repo, since):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (repo, since) VALUES (?, ?) "
+                "ON CONFLICT (repo) DO UPDATE SET since = excluded.since",
+                (repo, since)
+            )
+
+    def upsert_issues(self, repo, issues):
+        """
+        Store open issues and drop closed ones.
+
+        Returns the number of issues whose cached comments were invalidated.
+        """
+        invalidated = 0
+        with self.conn:
+            for issue in issues:
+                if issue.get('state', 'open') != 'open':
+                    self.conn.execute("DELETE FROM issues WHERE repo = ? AND number = ?", (repo, issue['number']))
+                    continue
+
+                row = self.conn.execute(
+                    "SELECT updated_at FROM issues WHERE repo = ? AND number = ?", (repo, issue['number'])
+                ).fetchone()
+                if row and row[0] == issue['updated_at']:
+                    # Unchanged (the `since` filter is inclusive), keep the cached comments
+                    continue
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO issues (repo, number, created_at, updated_at, data, comments) "
+                    "VALUES (?, ?, ?, ?, ?, NULL)",
+                    (repo, issue['number'], issue['created_at'], issue['updated_at'], json.dumps(issue))
+                )
+                invalidated += 1
+        return invalidated
+
+    def set_comments(self, repo, comments_by_number):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE issues SET comments = ? WHERE repo = ? AND number = ?",
+                [(json.dumps(comments), repo, number) for number, comments in comments_by_number.items()]
+            )
+
+    def get_stale_issues(self, repo):
+        """Return cached issues whose comments still need to be fetched."""
+        rows = self.conn.execute(
+            "SELECT data FROM issues WHERE repo = ? AND comments IS NULL ORDER BY created_at DESC, number DESC",
+            (repo,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def get_issues(self, repo):
+        """
+        Return all cached open issues and their comments.
+
+        Issues are in the order the REST API lists them (newest first), together with a
+        dict mapping issue numbers to comment lists as used by format_issue_data.
+        """
+        rows = self.conn.execute(
+            "SELECT data, comments FROM issues WHERE repo = ? ORDER BY created_at DESC, number DESC",
+            (repo,)
+        )
+        issues = []
+        comments_by_number = {}
+        for data, comments in rows:
+            issue = json.loads(data)
+            issues.append(issue)
+            comments_by_number[issue['number']] = json.loads(comments) if comments else []
+        return issues, comments_by_number
@@ -0,0 +1,77 @@
+import json
+import os
+
+from issue_writers import truncate_partial_line
+
+# Fields of a listed issue that format_issue and get_issue_comments need
+CHECKPOINT_ISSUE_FIELDS = ("number", "title", "body", "html_url", "comments")
+
+class Checkpoint:
+    """
+    Append-only log of extraction progress, so an interrupted run can be resumed.
+
+    The log is a JSON Lines file. Its first line identifies the repository, followed by
+    one line per completed issue page (with the issues on it, trimmed to the fields
+    needed for formatting) and one line per issue whose output has been written.
+    """
+
+    def __init__(self, path, repo, resume=False):
+        self.path = path
+        self.repo = repo
+        self.pages = {}
+        self.done = set()
+
+        if resume and os.path.exists(path):
+            truncate_partial_line(path)
+            self._load()
+            self.file = open(path, 'a', encoding='utf-8')
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            self._append({"repo": repo})
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                entry = json.loads(line)
+                if line_number == 0:
+                    if entry.get("repo") != self.repo:
+                        raise ValueError(f"Checkpoint {self.path} belongs to {entry.get('repo')}, not {self.repo}")
+                elif "page" in entry:
+                    self.pages[entry["page"]] = entry["issues"]
+                elif "done" in entry:
+                    self.done.add(entry["done"])
+
+    def _append(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    @property
+    def last_page(self):
+        """Number of the last completed issue page, 0 if none."""
+        return max(self.pages, default=0)
+
+    def pending_issues(self):
+        """Yield issues from completed pages, in page order, whose output is not written yet."""
+        for page in sorted(self.pages):
+            for issue in self.pages[page]:
+                if issue["number"] not in self.done:
+                    yield issue
+
+    def record_page(self, page, issues):
+        trimmed = [
+            dict({field: issue.get(field) for field in CHECKPOINT_ISSUE_FIELDS},
+                 labels=[{"name": label["name"]} for label in issue.get("labels", [])])
+            for issue in issues
+        ]
+        self.pages[page] = trimmed
+        self._append({"page": page, "issues": trimmed})
+
+    def record_done(self, issue_number):
+        self.done.add(issue_number)
+        self._append({"done": issue_number})
+
+    def close(self, completed=False):
+        """Close the log, removing it if the run completed."""
+        self.file.close()
+        if completed:
+            os.remove(self.path)
@@ -0,0 +1,142 @@
+from datetime import datetime, timezone
+
+# The search API returns at most this many results per query
+SEARCH_RESULT_LIMIT = 1000
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 date or timestamp (as used by the GitHub API) into an aware datetime."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def format_timestamp(value):
+    """Format a date or timestamp the way the GitHub API expects it."""
+    return parse_timestamp(value).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class IssueFilter:
+    """
+    Criteria for selecting issues, pushed down to the GitHub API where possible.
+
+    Labels, assignee and the lower bound of the update window map onto parameters of
+    the issue listing. The created window, the upper bound of the update window and
+    excluding issues with linked pull requests are only supported by the search API,
+    so filters using them are run as a search query instead. Whatever the chosen
+    endpoint cannot express is checked client-side with `matches`.
+
+    Windows are inclusive of their `after` bound and exclusive of their `before` bound.
+    """
+
+    def __init__(self, labels=None, assignee=None, created_after=None, created_before=None,
+                 updated_after=None, updated_before=None, exclude_pull_requests=False, exclude_linked_prs=False):
+        self.labels = list(labels or [])
+        self.assignee = assignee
+        self.created_after = parse_timestamp(created_after) if created_after else None
+        self.created_before = parse_timestamp(created_before) if created_before else None
+        self.updated_after = parse_timestamp(updated_after) if updated_after else None
+        self.updated_before = parse_timestamp(updated_before) if updated_before else None
+        self.exclude_pull_requests = exclude_pull_requests
+        self.exclude_linked_prs = exclude_linked_prs
+
+    def is_active(self):
+        """Whether the filter restricts anything at all."""
+        return bool(self.labels or self.assignee or self.created_after or self.created_before or self.updated_after
+                    or self.updated_before or self.exclude_pull_requests or self.exclude_linked_prs)
+
+    def needs_search(self):
+        """Whether the filter can only be pushed down through the search API."""
+        return bool(self.created_after or self.created_before or self.updated_before or self.exclude_linked_prs)
+
+    def build_request(self, api_url, repo_owner, repo_name, state="open", since=None):
+        """
+        Return the URL and query parameters (without paging) to list matching issues.
+
+        `since` further restricts the result to issues updated at or after that time.
+        Use `page_items` to get the issues out of a response.
+        """
+        since = max(filter(None, [parse_timestamp(since) if since else None, self.updated_after]), default=None)
+
+        if self.needs_search():
+            return f"{api_url}/search/issues", {
+                "q": self.search_query(repo_owner, repo_name, state, since),
+                "sort": "created",
+                "order": "desc"
+            }
+
+        params = {"state": state}
+        if self.labels:
+            params["labels"] = ",".join(self.labels)
+        if self.assignee:
+            params["assignee"] = self.assignee
+        if since:
+            params["since"] = format_timestamp(since)
+        return f"{api_url}/repos/{repo_owner}/{repo_name}/issues", params
+
+    def search_query(self, repo_owner, repo_name, state="open", since=None):
+        """Build the search API query string for this filter."""
+        terms = [f"repo:{repo_owner}/{repo_name}"]
+        if state != "all":
+            terms.append(f"is:{state}")
+        if self.exclude_pull_requests or self.exclude_linked_prs:
+            terms.append("is:issue")
+        terms.extend(f'label:"{label}"' for label in self.labels)
+        if self.assignee == "none":
+            terms.append("no:assignee")
+        elif self.assignee and self.assignee != "*":
+            terms.append(f"assignee:{self.assignee}")
+        if self.created_after:
+            terms.append(f"created:>={format_timestamp(self.created_after)}")
+        if self.created_before:
+            terms.append(f"created:<{format_timestamp(self.created_before)}")
+        if since:
+            terms.append(f"updated:>={format_timestamp(since)}")
+        if self.updated_before:
+            terms.append(f"updated:<{format_timestamp(self.updated_before)}")
+        if self.exclude_linked_prs:
+            terms.append("-linked:pr")
+        return " ".join(terms)
+
+    def is_last_page(self, page, per_page):
+        """Whether `page` is the last one the chosen endpoint will return."""
+        return self.needs_search() and page * per_page >= SEARCH_RESULT_LIMIT
+
+    def matches(self, issue):
+        """
+        Check an issue (as returned by the REST API) against the filter client-side.
+
+        Linked pull requests are not part of the issue payload and are not checked here.
+        """
+        if self.exclude_pull_requests and 'pull_request' in issue:
+            return False
+
+        if self.labels:
+            issue_labels = {label['name'].lower() for label in issue.get('labels', [])}
+            if not all(label.lower() in issue_labels for label in self.labels):
+                return False
+
+        if self.assignee:
+            assignees = {a['login'].lower() for a in issue.get('assignees') or [] if a}
+            if issue.get('assignee'):
+                assignees.add(issue['assignee']['login'].lower())
+            if self.assignee == "*":
+                if not assignees:
+                    return False
+            elif self.assignee == "none":
+                if assignees:
+                    return False
+            elif self.assignee.lower() not in assignees:
+                return False
+
+        for field, after, before in (('created_at', self.created_after, self.created_before),
+                                     ('updated_at', self.updated_after, self.updated_before)):
+            if (after or before) and issue.get(field):
+                value = parse_timestamp(issue[field])
+                if (after and value < after) or (before and value >= before):
+                    return False
+
+        return True
+
+def page_items(data):
+    """Return the issues of a listing or search API response body."""
+    return data['items'] if isinstance(data, dict) else data
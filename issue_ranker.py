@@ -0,0 +1,137 @@
+"""
+Local heuristic ranking of formatted issues (as produced by format_issue_data).
+
+Features are computed for a whole batch at once, one column per feature, with plain
+substring counts: label signals, discussion length, description length, code
+blocks, keyword hits and signs that someone already works on the issue. A weighted
+sum of the capped features gives each issue a score; higher means a better fit for a
+newcomer. The same features give a rough complexity and time estimate, in the form
+used by the backend's Issue model.
+"""
+
+# Label fragments that make an issue a better or worse fit for a newcomer
+POSITIVE_LABELS = ("good first issue", "good-first-issue", "beginner", "easy", "starter", "help wanted",
+                   "documentation", "docs", "typo")
+NEGATIVE_LABELS = ("needs design", "needs-design", "discussion", "question", "wontfix", "won't fix", "duplicate",
+                   "invalid", "blocked", "epic", "rfc", "proposal")
+
+# Words in the title or description hinting at small or at large changes
+NEWCOMER_KEYWORDS = ("typo", "spelling", "readme", "docs", "documentation", "docstring", "example", "rename",
+                     "error message", "broken link", "small", "simple", "minor", "add test", "missing test")
+HARD_KEYWORDS = ("refactor", "architecture", "redesign", "rewrite", "performance", "race condition", "deadlock",
+                 "memory leak", "security", "breaking change", "migration", "concurrency", "flaky", "regression")
+
+# Phrases in the discussion pointing at a pull request ("fixed by #12", "closed in #12"),
+# or at someone claiming the issue
+LINKED_PR_MARKERS = ("/pull/", "pr #", "by #", "in #", "fixes #")
+CLAIMED_MARKERS = ("working on", "work on this", "i'll take", "i will take", "assign me", "assigned to me")
+
+# Characters of the description and of each comment searched for keywords and markers,
+# the same amount the LLM prompt keeps of them
+SCAN_CHARS = 500
+
+# (feature, weight, cap): each feature adds weight * min(value, cap) to the score
+SCORE_WEIGHTS = (
+    ("positive_labels", 3.0, 3),
+    ("negative_labels", -3.0, 3),
+    ("comments", -0.2, 20),  # Long threads usually mean an unsettled or contentious issue
+    ("empty_body", -2.0, 1),  # An empty description is hard to act on
+    ("long_body", -1.0, 1),  # A very long one is rarely small
+    ("code_blocks", 0.5, 2),  # Snippets or tracebacks make an issue easier to reproduce
+    ("newcomer_keywords", 1.0, 3),
+    ("hard_keywords", -1.5, 3),
+    ("linked_prs", -4.0, 1),
+    ("claimed", -2.0, 1),
+)
+
+# (feature, weight, cap) for the effort estimate, and the complexity and time for
+# efforts up to each bound
+EFFORT_WEIGHTS = (
+    ("body_kchars", 1.0, 5),
+    ("code_blocks", 0.5, 4),
+    ("hard_keywords", 1.5, 3),
+    ("comments", 0.1, 20),
+    ("newcomer_keywords", -0.5, 3),
+    ("positive_labels", -0.5, 2),
+)
+EFFORT_LEVELS = (
+    (0.5, "Easy", "30 minutes"),
+    (1.0, "Easy", "1 hour"),
+    (2.0, "Medium", "2 hours"),
+    (3.0, "Medium", "4 hours"),
+    (5.0, "Hard", "1 day"),
+    (float("inf"), "Hard", "several days"),
+)
+
+LONG_BODY_CHARS = 4000
+
+def _count_markers(texts, markers):
+    """Count occurrences of any of `markers` in each text."""
+    return [sum(map(text.count, markers)) for text in texts]
+
+def extract_features(issues):
+    """Compute the feature columns for a batch of formatted issues, as a dict of name to list."""
+    bodies = [(issue['comments'][0]['text'] or "") if issue['comments'] else "" for issue in issues]
+    texts = [f"{issue['title']}\n{body[:SCAN_CHARS]}".lower() for issue, body in zip(issues, bodies)]
+    # Repositories reuse a handful of labels, so each distinct label is classified once
+    label_signals = {}
+    for issue in issues:
+        for label in issue['labels']:
+            if label not in label_signals:
+                name = label.lower()
+                label_signals[label] = (any(f in name for f in POSITIVE_LABELS), any(f in name for f in NEGATIVE_LABELS))
+    discussions = ["\n".join((comment['text'] or "")[:SCAN_CHARS] for comment in issue['comments'][1:]).lower()
+                   for issue in issues]
+    body_lengths = [len(body) for body in bodies]
+
+    return {
+        "positive_labels": [sum(label_signals[label][0] for label in issue['labels']) for issue in issues],
+        "negative_labels": [sum(label_signals[label][1] for label in issue['labels']) for issue in issues],
+        "comments": [max(len(issue['comments']) - 1, 0) for issue in issues],
+        "empty_body": [int(length == 0) for length in body_lengths],
+        "long_body": [int(length > LONG_BODY_CHARS) for length in body_lengths],
+        "body_kchars": [length / 1000 for length in body_lengths],
+        "code_blocks": [body.count("```") // 2 for body in bodies],
+        "newcomer_keywords": _count_markers(texts, NEWCOMER_KEYWORDS),
+        "hard_keywords": _count_markers(texts, HARD_KEYWORDS),
+        "linked_prs": _count_markers(discussions, LINKED_PR_MARKERS),
+        "claimed": _count_markers(discussions, CLAIMED_MARKERS),
+    }
+
+def _weighted_sum(features, weights, count):
+    totals = [0.0] * count
+    for name, weight, cap in weights:
+        totals = [total + weight * min(value, cap) for total, value in zip(totals, features[name])]
+    return totals
+
+def score_issues(issues):
+    """Score a batch of formatted issues; higher scores are better first issues."""
+    return _weighted_sum(extract_features(issues), SCORE_WEIGHTS, len(issues))
+
+def rank_issues(issues):
+    """
+    Score a batch of formatted issues and estimate the effort each one takes.
+
+    Returns one `{"number", "score", "complexity", "estimated_time"}` dict per issue,
+    in the order of `issues`.
+    """
+    features = extract_features(issues)
+    scores = _weighted_sum(features, SCORE_WEIGHTS, len(issues))
+    efforts = _weighted_sum(features, EFFORT_WEIGHTS, len(issues))
+
+    rankings = []
+    for issue, score, effort in zip(issues, scores, efforts):
+        _, complexity, estimated_time = next(level for level in EFFORT_LEVELS if effort <= level[0])
+        rankings.append({"number": issue['number'], "score": score, "complexity": complexity,
+                         "estimated_time": estimated_time})
+    return rankings
+
+def sort_by_score(issues):
+    """Return the issues best first; issues with equal scores keep their order."""
+    scores = score_issues(issues)
+    order = sorted(range(len(issues)), key=lambda i: -scores[i])
+    return [issues[i] for i in order]
+
+def shortlist_issues(issues, top_n):
+    """Return the `top_n` best scoring issues, best first."""
+    return sort_by_score(issues)[:top_n]
@@ -0,0 +1,93 @@
+import json
+import os
+
+class JsonArrayWriter:
+    """
+    Writes items to a JSON array one at a time.
+
+    The result is byte-for-byte what `json.dump(items, f, indent=2, ensure_ascii=False)`
+    would produce, without holding all items in memory.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, item):
+        text = json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self.file.write(("[\n  " if self.count == 0 else ",\n  ") + text)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.write("\n]" if self.count else "[]")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class JsonLinesWriter:
+    """Writes items as JSON Lines, one compact JSON object per line."""
+
+    def __init__(self, path, append=False):
+        if append:
+            truncate_partial_line(path)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, item):
+        self.file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def open_writer(path, output_format, append=False):
+    """
+    Open a streaming writer for `output_format` ("json" or "jsonl").
+
+    Only JSON Lines files can be appended to.
+    """
+    if output_format == 'jsonl':
+        return JsonLinesWriter(path, append=append)
+    if append:
+        raise ValueError("Only JSON Lines output can be appended to")
+    return JsonArrayWriter(path)
+
+def truncate_partial_line(path):
+    """Drop an incomplete last line left behind by a crash mid-write, if any."""
+    try:
+        with open(path, 'rb+') as f:
+            # Scan backwards from the end for the last newline
+            position = f.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+    except FileNotFoundError:
+        pass
+
+def read_jsonl(path):
+    """Yield the items of a JSON Lines file, or nothing if it does not exist."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
@@ -0,0 +1,120 @@
+"""
+On-disk cache for LLM results, addressed by the content that produced them.
+
+Entries are keyed by a hash of everything that determines the result (model,
+temperature, prompt, ...), so an unchanged input is a cache hit and any change is a
+miss; nothing needs invalidating. Each entry is one JSON file under a namespace
+prefix ("reply" for whole replies, "score" for per-issue ranking results).
+
+Entries older than `max_age` seconds are dropped. When the directory grows beyond
+`max_bytes`, the least recently used entries are removed first. The defaults come
+from LLM_CACHE_MAX_MB (100) and LLM_CACHE_MAX_AGE_DAYS (30).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("LLM_CACHE_MAX_MB", 100)) * 1024 * 1024)
+DEFAULT_MAX_AGE = int(float(os.environ.get("LLM_CACHE_MAX_AGE_DAYS", 30)) * 24 * 3600)
+
+def content_key(*parts):
+    """Hash JSON-serializable `parts` into a cache key."""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Directory of cached LLM results with age and size based eviction."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = self.prune()
+
+    def _path(self, namespace, key):
+        return os.path.join(self.directory, f"{namespace}-{key}.json")
+
+    def get(self, namespace, key):
+        """Return the cached value for `key`, or None if it is missing or expired."""
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is not None and time.time() - entry["created"] > self.max_age:
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # The modification time tracks the last use for the size based eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["value"]
+
+    def put(self, namespace, key, value):
+        """Store `value` for `key`, evicting old entries if the cache grew too large."""
+        path = self._path(namespace, key)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "value": value}, f, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            size = self.prune()
+            with self._lock:
+                self._size = size
+
+    def prune(self):
+        """
+        Remove entries unused for longer than `max_age`, then the least recently used
+        ones until the cache fits in `max_bytes`. Returns the remaining size in bytes.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            self._remove(path)
+            size -= entry_size
+        return size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
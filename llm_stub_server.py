@@ -0,0 +1,138 @@
+"""
+Local stand-in for the OpenAI chat completions API, so the LLM steps can be run
+offline and without cost. Point the extractor at it with the OPENAI_API_URL
+environment variable:
+
+    python llm_stub_server.py --delay 1
+    OPENAI_API_URL=http://localhost:8766/v1 OPENAI_API_KEY=stub python extract_issues.py https://github.com/owner/repo
+
+Replies are derived from the issue numbers (`#123`) at the start of prompt lines.
+Requests for a JSON object (a shard ranking) get the first issues of the prompt, as
+many as the prompt asks for; other requests get a recommendation of the first issue.
+`--delay` simulates model latency and `--fail-rate` answers that fraction of requests
+with 429 Too Many Requests, to exercise the retries.
+
+Streaming requests ("stream": true) are answered with server-sent events in a chunked
+response, one word per event, `--token-delay` seconds apart.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def stub_reply(prompt, json_response=False):
+    """Build the reply text for a prompt."""
+    numbers = [int(n) for n in re.findall(r"^#(\d+) ", prompt, re.MULTILINE)]
+    if json_response:
+        top_k = re.search(r"Pick the (\d+) issues", prompt)
+        picks = numbers[:int(top_k.group(1)) if top_k else 3]
+        return json.dumps({"issues": [
+            {"number": number, "score": 10 - i, "reason": "Listed early in the prompt."}
+            for i, number in enumerate(picks)
+        ]})
+    if not numbers:
+        return "No issues to recommend."
+    return f"The best first issue is #{numbers[0]}: it is the first one listed in the prompt."
+
+def make_handler(delay=0.0, fail_rate=0.0, token_delay=0.0):
+    """Create a request handler class answering chat completion requests."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        # Keep connections alive like the real API does
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'null')
+
+            if not self.path.rstrip('/').endswith("/chat/completions"):
+                self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            if random.random() < fail_rate:
+                self.send_json(429, {"error": {"message": "Rate limit reached (stub)"}}, {"Retry-After": "1"})
+                return
+
+            time.sleep(delay)
+            prompt = "\n".join(m.get('content', "") for m in body.get('messages', []) if m.get('role') == 'user')
+            json_response = (body.get('response_format') or {}).get('type') == 'json_object'
+            content = stub_reply(prompt, json_response)
+            if body.get('stream'):
+                self.send_stream(body.get('model'), content)
+                return
+            self.send_json(200, {
+                "object": "chat.completion",
+                "model": body.get('model'),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            })
+
+        def send_json(self, status_code, body, headers=None):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def send_stream(self, model, content):
+            """Send `content` as chat completion chunk events, one word at a time."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            words = re.findall(r"\S+\s*", content)
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(token_delay)
+                chunk = {
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]
+                }
+                self.send_chunk(f"data: {json.dumps(chunk)}\n\n")
+            self.send_chunk("data: [DONE]\n\n")
+            self.send_chunk("")
+
+        def send_chunk(self, text):
+            """Write one chunk of a chunked response; an empty text ends the response."""
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} - {format % args}", file=sys.stderr)
+
+    return StubHandler
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve canned OpenAI chat completions from a local HTTP server.')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=8766, help='Port to listen on (default: 8766)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before each reply (default: 0)')
+    parser.add_argument('--token-delay', type=float, default=0.05,
+                        help='Seconds between the words of a streamed reply (default: 0.05)')
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 429 Too Many Requests (default: 0)')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay, args.fail_rate, args.token_delay))
+    print(f"Serving chat completions on http://{args.host}:{args.port}/v1", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
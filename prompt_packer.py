@@ -0,0 +1,105 @@
+"""
+Packs formatted issues into LLM prompts under a token budget.
+
+Issues are ordered by the local heuristic score of issue_ranker, encoded
+in a compact plain-text form and added until the budget is used up, or dealt out into
+shards of a fixed budget that together hold every issue. Tokens are counted
+locally with tiktoken when it is installed, and estimated from the text length
+otherwise.
+"""
+
+import re
+
+from issue_ranker import sort_by_score
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Characters kept per comment before truncating
+DEFAULT_MAX_COMMENT_CHARS = 500
+
+_encoding = None
+
+def count_tokens(text):
+    """Count the tokens of `text`, estimating roughly 4 characters per token without tiktoken."""
+    global _encoding
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    return len(_encoding.encode(text, disallowed_special=()))
+
+def _compact(text, max_chars):
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text[:max_chars] + "..." if len(text) > max_chars else text
+
+def encode_issue(issue, max_comment_chars=DEFAULT_MAX_COMMENT_CHARS, max_comments=None):
+    """
+    Encode a formatted issue as compact text.
+
+    The first line holds the number, title and labels, followed by one line per comment
+    prefixed with its index (0 is the issue body).
+    """
+    header = f"#{issue['number']} {_compact(issue['title'], 300)}"
+    if issue['labels']:
+        header += f" [{', '.join(issue['labels'])}]"
+    comments = issue['comments'] if max_comments is None else issue['comments'][:max_comments]
+    lines = [header] + [f"{comment['index']}: {_compact(comment['text'], max_comment_chars)}" for comment in comments]
+    return "\n".join(lines)
+
+def pack_issues(issues, token_budget, max_comment_chars=DEFAULT_MAX_COMMENT_CHARS):
+    """
+    Encode as many issues as fit in `token_budget`, most promising first.
+
+    An issue that does not fit with its whole discussion is tried again with only its
+    description. Returns the packed text and a report of `(issue number, tokens)` for
+    every packed issue, in packing order.
+    """
+    packed = []
+    report = []
+    remaining = token_budget
+
+    for issue in sort_by_score(issues):
+        for max_comments in (None, 1):
+            text = encode_issue(issue, max_comment_chars, max_comments)
+            tokens = count_tokens(text) + 1  # Separating newline
+            if tokens <= remaining:
+                packed.append(text)
+                report.append((issue['number'], tokens))
+                remaining -= tokens
+                break
+        if remaining <= 0:
+            break
+
+    return "\n\n".join(packed), report
+
+def shard_issues(issues, shard_token_budget, max_comment_chars=DEFAULT_MAX_COMMENT_CHARS):
+    """
+    Split all issues into shards of at most `shard_token_budget` tokens each.
+
+    Unlike pack_issues no issue is left out: one that does not fit a shard with its
+    whole discussion gets only its description, and one too large even then gets a
+    shard of its own. Issues are dealt out most promising first. Returns a list of
+    `(packed text, issue numbers)` pairs.
+    """
+    shards = []
+    texts, numbers, used = [], [], 0
+
+    for issue in sort_by_score(issues):
+        for max_comments in (None, 1):
+            text = encode_issue(issue, max_comment_chars, max_comments)
+            tokens = count_tokens(text) + 1  # Separating newline
+            if tokens <= shard_token_budget:
+                break
+        if texts and used + tokens > shard_token_budget:
+            shards.append(("\n\n".join(texts), numbers))
+            texts, numbers, used = [], [], 0
+        texts.append(text)
+        numbers.append(issue['number'])
+        used += tokens
+
+    if texts:
+        shards.append(("\n\n".join(texts), numbers))
+    return shards
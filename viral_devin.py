@@ -1,6 +1,8 @@
 import requests
 import os
 from dotenv import load_dotenv
+from github_http import get_session
+from issue_filters import IssueFilter, page_items
 
 load_dotenv()
 # Replace with your GitHub personal access token (PAT) if needed for private repos or rate limiting
@@ -8,13 +10,17 @@ load_dotenv()
 # Store it in an environment variable for security best practice
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")  # Optional: For authentication
 
-def get_good_first_issues(repo_owner, repo_name):
+def get_good_first_issues(repo_owner, repo_name, issue_filter=None):
     """
-    Retrieves all open issues from a GitHub repository and prints those with the "good first issue" label.
+    Retrieves the open issues of a GitHub repository that carry the "good first issue" label.
+
+    The label (and any other criteria) is pushed down to the GitHub API, so only
+    matching issues are downloaded.
 
     Args:
         repo_owner: The owner of the repository (e.g., "facebook").
         repo_name: The name of the repository (e.g., "react").
+        issue_filter: Optional IssueFilter to use instead of the "good first issue" label.
 
     Returns:
         A list of dictionaries, where each dictionary represents a "good first issue".
@@ -22,7 +28,8 @@ def get_good_first_issues(repo_owner, repo_name):
         Also prints informative messages to the console.
     """
 
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues"
+    issue_filter = issue_filter or IssueFilter(labels=["good first issue"])
+    url, base_params = issue_filter.build_request("https://api.github.com", repo_owner, repo_name)
     headers = {}
     if GITHUB_TOKEN:
         headers["Authorization"] = f"token {GITHUB_TOKEN}"
@@ -30,20 +37,20 @@ def get_good_first_issues(repo_owner, repo_name):
     all_good_first_issues = []
     page = 1
     while True:
-        params = {"state": "open", "page": page, "per_page": 100} # Increased per_page for efficiency
+        params = dict(base_params, page=page, per_page=100) # Increased per_page for efficiency
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-            issues = response.json()
+            issues = page_items(response.json())
 
             if not issues:  # No more issues, break the loop
                 break
 
-            for issue in issues:
-                labels = issue.get('labels', [])
-                if any(label['name'].lower() == 'good first issue' for label in labels):
-                    all_good_first_issues.append(issue)
+            # Only criteria the API could not apply are checked here
+            all_good_first_issues.extend(issue for issue in issues if issue_filter.matches(issue))
 
+            if len(issues) == 100 and issue_filter.is_last_page(page, 100):
+                break
             page += 1
 
         except requests.exceptions.RequestException as e: